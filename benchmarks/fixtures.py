@@ -0,0 +1,169 @@
+"""
+Recorded inputs for the offline benchmarks
+
+`python -m benchmarks.fixtures` records the live IMF pages, the TSV, the Google Sheets
+and a WEO GDP slice into benchmarks/fixtures. When nothing has been recorded, synthetic
+fixtures with the same format are built from output/sdr.csv so the suite still runs offline.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIXTURES_PATH: Path = Path(__file__).resolve().parent / "fixtures"
+PROJECT: Path = Path(__file__).resolve().parent.parent
+
+SHEET_GIDS: tuple = (0, 116752025, 1174650744)
+RST_GID: int = 1296770218
+
+
+def _kind(url: str) -> str:
+    """Classifies a remote url into the name of the fixture that replays it"""
+
+    gid = re.search(r"gid=(\d+)", url)
+    if "2PACX-1vTqLJ" in url:
+        return f"rst_{gid.group(1)}.csv"
+    if "output=csv" in url:
+        return f"sheet_{gid.group(1)}.csv"
+    if "extsdr3" in url:
+        return "imf_index.html"
+    if "tsvflag" in url or url.lower().endswith(".tsv"):
+        return "imf_release.tsv"
+    if "extsdr" in url:
+        return "imf_release.html"
+
+    raise KeyError(f"No fixture for {url}")
+
+
+def record() -> None:
+    """Downloads every remote input of the pipeline into benchmarks/fixtures"""
+
+    from scripts import download_sdr, http_cache, http_client, imf, rst, utils
+
+    FIXTURES_PATH.mkdir(exist_ok=True)
+    urls = []
+    cached_fetch = http_cache.fetch
+
+    def recording_fetch(url, **kwargs):
+        content = http_client.get(url).content
+        (FIXTURES_PATH / _kind(url)).write_bytes(content)
+        urls.append(url)
+        return content
+
+    http_cache.fetch = recording_fetch
+    try:
+        year = pd.Timestamp.now().year
+        release = download_sdr._find_latest_release(year)
+        download_sdr._get_df(download_sdr._get_tsv_url(release["url"]), release["date"])
+        for gid in SHEET_GIDS:
+            utils.read_sheet(gid)
+        rst._read_rst_data(RST_GID)
+    finally:
+        http_cache.fetch = cached_fetch
+
+    imf._gdp_table(imf._weo_vintage()).to_csv(FIXTURES_PATH / "gdp.csv", index=False)
+    print(f"Recorded {len(urls)} responses and the WEO GDP table to {FIXTURES_PATH}")
+
+
+def _synthetic_tsv(sdr: pd.DataFrame) -> bytes:
+    """Builds an IMF holdings TSV from the holdings and allocations in sdr.csv"""
+
+    import country_converter as coco
+
+    names = coco.convert(sdr.iso_code.tolist(), to="name_short")
+    lines = [
+        "SDR Allocations and Holdings",
+        "for all members as of September 30, 2026",
+        "(in SDRs)",
+        "Members\tSDR Holdings\tSDR Allocations",
+    ]
+    for name, holdings, allocations in zip(
+        names, sdr.holdings_sdr, sdr.allocations_sdr
+    ):
+        if pd.notna(holdings):
+            lines.append(f"{name}\t{holdings * 1e6:,.0f}\t{allocations * 1e6:,.0f}")
+    lines.append("Total\t0\t0")
+
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+def synthesize() -> dict:
+    """Builds synthetic fixtures in the recorded formats from output/sdr.csv"""
+
+    sdr = pd.read_csv(PROJECT / "output" / "sdr.csv")
+    rng = np.random.default_rng(0)
+
+    tracker = sdr.filter(
+        [
+            "iso_code",
+            "country",
+            "region",
+            "sdrs_allocation_aug_23_sdr",
+            "sdrs_allocation_aug_23_usd",
+            "text",
+        ],
+        axis=1,
+    )
+    for column in ["sdrs_allocation_aug_23_sdr", "sdrs_allocation_aug_23_usd"]:
+        tracker[column] = (tracker[column] * 1e6).map(
+            lambda v: "" if pd.isna(v) else f"{v:,.0f}"
+        )
+
+    references = pd.DataFrame(
+        {
+            "iso_code": np.repeat(sdr.iso_code.values, 2),
+            "sources": [f"Reference {i}" for i in range(2 * len(sdr))],
+            "link": [f"https://example.org/{i}" for i in range(2 * len(sdr))],
+        }
+    )
+    rst_timeline = pd.concat(
+        pd.read_csv(f)
+        for f in sorted((PROJECT / "output" / "rst_timeline").glob("*.csv"))
+    )
+    gdp = pd.DataFrame(
+        [
+            (iso_code, year, rng.uniform(1e9, 5e11))
+            for year in range(2000, 2031)
+            for iso_code in sdr.iso_code
+        ],
+        columns=["iso_code", "year", "gdp"],
+    )
+
+    return {
+        "sheet_0.csv": tracker.to_csv(index=False).encode(),
+        "sheet_116752025.csv": (
+            b"indicator,value,date\nusd_exchange_rate,0.7312,2026-10-16\n"
+        ),
+        "sheet_1174650744.csv": references.to_csv(index=False).encode(),
+        f"rst_{RST_GID}.csv": rst_timeline.to_csv(index=False).encode(),
+        "imf_index.html": (
+            "<html>"
+            + "<table><tr><td></td></tr></table>" * 4
+            + '<table><tr><td><a href="extsdr2.aspx?date1key=2026-09-30">'
+            "September 30, 2026</a></td></tr></table></html>"
+        ).encode(),
+        "imf_release.html": (
+            b'<html><a href="extsdr2.aspx?date1key=2026-09-30&tsvflag=Y">TSV</a></html>'
+        ),
+        "imf_release.tsv": _synthetic_tsv(sdr),
+        "gdp.csv": gdp.to_csv(index=False).encode(),
+    }
+
+
+def load() -> dict:
+    """
+    Returns every fixture as bytes, keyed by file name.
+    Recorded fixtures are used where they exist, synthetic ones otherwise.
+    """
+
+    recorded = {}
+    if FIXTURES_PATH.exists():
+        recorded = {f.name: f.read_bytes() for f in FIXTURES_PATH.iterdir()}
+
+    return {**synthesize(), **recorded}
+
+
+if __name__ == "__main__":
+    record()
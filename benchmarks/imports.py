@@ -0,0 +1,107 @@
+"""
+Import-time benchmarks for the entry points of the scheduled jobs
+
+    python -m benchmarks.imports                    time the import of every entry point
+    python -m benchmarks.imports --save-baseline    store the results in benchmarks/import_baseline.json
+    python -m benchmarks.imports --compare          fail if an import is slower than the baseline
+
+Each entry point is imported in a fresh interpreter with `python -X importtime`. The check
+also fails when an entry point imports one of the heavy modules that must load lazily.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks import fixtures
+from benchmarks.run import compare
+
+BASELINE_PATH: Path = Path(__file__).resolve().parent / "import_baseline.json"
+
+# Modules imported by each job, and the heavy modules they must not load at import time
+ENTRY_POINTS: dict = {
+    "update_sdrs": ("bblocks", "gspread", "oauth2client", "country_converter"),
+    "update": ("bblocks", "gspread", "oauth2client", "country_converter"),
+    "scripts.rst": ("bblocks", "gspread", "oauth2client", "country_converter"),
+}
+
+
+def _import(module: str) -> tuple[float, set]:
+    """Imports a module in a fresh interpreter. Returns the seconds taken and the modules loaded"""
+
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    # credentials must not be needed to import a module
+    env = {k: v for k, v in os.environ.items() if k != "SHEETS_API"}
+    env["PYTHONPATH"] = str(fixtures.PROJECT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=fixtures.PROJECT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines look like "import time:   self [us] | cumulative | imported package"
+    pattern = rf"import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$"
+    cumulative = re.search(pattern, result.stderr, flags=re.MULTILINE)
+
+    return int(cumulative.group(1)) / 1e6, set(json.loads(result.stdout))
+
+
+def run(repeat: int = 5) -> tuple[dict, list]:
+    """
+    Times the import of every entry point
+    Returns the median seconds as {entry point: {"import": seconds}} and the
+    (entry point, module) pairs where a heavy module was loaded
+    """
+
+    results, eager = {}, []
+    for module, lazy in ENTRY_POINTS.items():
+        timings = []
+        for _ in range(repeat):
+            seconds, loaded = _import(module)
+            timings.append(seconds)
+        eager += [(module, m) for m in lazy if m in loaded]
+        median = statistics.median(timings)
+        results[module] = {"import": round(median, 5)}
+        print(f"{module:<20} {median * 1e3:>10.2f} ms")
+
+    return results, eager
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    if args.compare and not BASELINE_PATH.exists():
+        sys.exit(
+            f"No baseline at {BASELINE_PATH}. "
+            "Run python -m benchmarks.imports --save-baseline first"
+        )
+
+    results, eager = run(args.repeat)
+    for module, heavy in eager:
+        print(f"Eager import: {module} loads {heavy}")
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2))
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    regressions = []
+    if args.compare:
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()))
+        for module, _, reference, seconds in regressions:
+            print(
+                f"Regression: importing {module} took {seconds * 1e3:.2f} ms "
+                f"(baseline {reference * 1e3:.2f} ms)"
+            )
+    sys.exit(1 if eager or regressions else 0)
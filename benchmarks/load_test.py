@@ -0,0 +1,103 @@
+"""
+Load test for the read-only query service
+
+    python -m benchmarks.load_test [--clients 8] [--requests 2000]
+
+Starts scripts/server.py on a free port over the current outputs and runs concurrent
+keep-alive clients against per-country, filtered and RST queries. Half of the requests
+revalidate with If-None-Match. Also times lookups on the in-memory store directly.
+"""
+
+import argparse
+import http.client
+import random
+import statistics
+import threading
+import time
+import timeit
+
+from scripts import server
+
+
+def _paths(store: server.Store) -> list[str]:
+    """Returns a mix of the queries the service answers"""
+
+    codes = sorted(store.countries)
+    regions = sorted(store.by_region)
+
+    return (
+        [f"/countries/{c}" for c in codes]
+        + [f"/countries?region={r.replace(' ', '%20')}" for r in regions]
+        + [f"/rst/{c}" for c in sorted(store.timelines)]
+        + ["/countries", "/regions", "/rst", "/rst?from=2024-01-01"]
+    )
+
+
+def _client(port: int, paths: list, n: int, latencies: list, statuses: list) -> None:
+    """Sends n requests on one keep-alive connection"""
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    etags = {}
+    for _ in range(n):
+        path = random.choice(paths)
+        headers = {}
+        if path in etags and random.random() < 0.5:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status)
+        etags[path] = response.getheader("ETag")
+    connection.close()
+
+
+def run(clients: int = 8, requests: int = 2000) -> dict:
+    """Runs the load test and returns requests per second, latency percentiles and status counts"""
+
+    httpd = server.make_server(port=0)
+    port = httpd.server_address[1]
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    paths = _paths(httpd.store)
+    latencies, statuses = [], []
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(port, paths, requests // clients, latencies, statuses),
+        )
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    httpd.shutdown()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    number = 100_000
+    lookup = timeit.timeit(
+        lambda: httpd.store.response("/countries/KEN", {}), number=number
+    )
+
+    return {
+        "requests_per_second": round(len(latencies) / elapsed),
+        "p50_ms": round(quantiles[49] * 1e3, 3),
+        "p99_ms": round(quantiles[98] * 1e3, 3),
+        "not_modified": statuses.count(304),
+        "ok": statuses.count(200),
+        "lookup_us": round(lookup / number * 1e6, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, value in run(args.clients, args.requests).items():
+        print(f"{name:<22} {value}")
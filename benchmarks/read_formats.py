@@ -0,0 +1,64 @@
+"""
+Read-time benchmark for the exports of the tracker frame
+
+    python -m benchmarks.read_formats [--scale 10] [--repeat 5]
+
+Exports output/sdr.csv, with rows repeated scale times, in every format to a temporary
+folder, then times how long pandas takes to load each file.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from scripts import config, export
+
+
+def run(scale: int = 10, repeat: int = 5) -> dict:
+    """Returns the median seconds to read each format, and its size in bytes"""
+
+    df = pd.concat([pd.read_csv(config.Paths.output / "sdr.csv")] * scale)
+    readers = {
+        ".csv": pd.read_csv,
+        ".parquet": pd.read_parquet,
+        ".feather": pd.read_feather,
+        ".json": lambda path: pd.read_json(path, orient="split"),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "sdr"
+        df.to_csv(path.with_suffix(".csv"), index=False)
+        files = [path.with_suffix(".csv"), *export.write(df, path)]
+
+        for file in files:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                readers[file.suffix](file)
+                timings.append(time.perf_counter() - start)
+            results[file.suffix[1:]] = {
+                "seconds": round(statistics.median(timings), 5),
+                "bytes": file.stat().st_size,
+            }
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.scale, args.repeat)
+    for name, result in results.items():
+        speedup = results["csv"]["seconds"] / result["seconds"]
+        print(
+            f"{name:<8} {result['seconds'] * 1e3:>10.2f} ms {result['bytes'] / 1024:>10.0f} KB"
+            f" {speedup:>6.1f}x"
+        )
@@ -0,0 +1,317 @@
+"""
+Offline benchmarks for the update pipeline
+
+    python -m benchmarks.run                    time every target at 1x, 10x and 100x
+    python -m benchmarks.run --save-baseline    store the results in benchmarks/baseline.json
+    python -m benchmarks.run --compare          fail if a target is slower or uses more
+                                                memory than the baseline
+
+All remote inputs are replayed from benchmarks/fixtures and any attempt to reach the
+network raises an error. Outputs and caches are written to a temporary folder.
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from benchmarks import fixtures
+
+BASELINE_PATH: Path = Path(__file__).resolve().parent / "baseline.json"
+SCALES: tuple = (1, 10, 100)
+# A target regresses when it is this much slower, or its peak memory this much
+# higher, than the baseline
+TOLERANCE: float = 1.25
+
+
+def _block_network() -> None:
+    """Makes every HTTP request fail, so a benchmark can never reach the network"""
+
+    import requests
+
+    def blocked(*args, **kwargs):
+        raise RuntimeError("Network access is disabled in the benchmarks")
+
+    requests.get = blocked
+    requests.Session.request = blocked
+
+
+def _setup(workdir: Path, data: dict) -> None:
+    """Points every path at workdir and replays the fixtures instead of remote inputs"""
+
+    from scripts import config
+
+    config.Paths.raw_data = workdir / "raw_data"
+    config.Paths.output = workdir / "output"
+    config.Paths.glossaries = workdir / "glossaries"
+    (config.Paths.output / "rst_timeline").mkdir(parents=True)
+    config.Paths.glossaries.mkdir()
+    source = (
+        fixtures.PROJECT / "scripts" / "glossaries" / "flourish_geometries_world.json"
+    )
+    (config.Paths.glossaries / source.name).write_bytes(source.read_bytes())
+
+    _replay(data)
+    _block_network()
+
+
+def _replay(data: dict) -> None:
+    """Serves every remote input, and the WEO GDP table, from data"""
+
+    # modules read config.Paths when they are imported, so import them after _setup
+    from scripts import http_cache, imf
+
+    http_cache.fetch = lambda url, **kwargs: data[fixtures._kind(url)]
+    gdp = pd.read_csv(io.BytesIO(data["gdp.csv"]))
+    imf._gdp_table = lambda vintage: gdp
+
+
+def _copies(df: pd.DataFrame, scale: int, codes=(), names=()) -> pd.DataFrame:
+    """
+    Concatenates scale copies of df as distinct synthetic countries: in copy n,
+    codes like KEN become KENn and names like Kenya become "Kenya n"
+    """
+
+    frames = []
+    for copy in range(scale):
+        frame = df.copy()
+        if copy:
+            for column in codes:
+                frame[column] = frame[column] + str(copy)
+            for column in names:
+                frame[column] = frame[column] + f" {copy}"
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _scaled_tsv(content: bytes, scale: int, names: dict) -> bytes:
+    """Adds the countries of scale - 1 synthetic copies to the data rows of a TSV"""
+
+    from scripts import download_sdr
+
+    lines = content.splitlines(keepends=True)
+    header_end, header_lines = 0, 0
+    while header_lines < download_sdr.TSV_HEADER_LINES:
+        header_lines += bool(lines[header_end].strip())
+        header_end += 1
+    header, body = lines[:header_end], lines[header_end:]
+
+    copies = []
+    for copy in range(1, scale):
+        for line in body:
+            name, _, values = line.partition(b"\t")
+            if names.get(name.decode().strip()):
+                copies.append(f"{name.decode().strip()} {copy}\t".encode() + values)
+
+    return b"".join(header + body + copies)
+
+
+def _scaled_fixtures(data: dict, scale: int) -> dict:
+    """
+    Returns the fixtures with scale times the countries, and registers the names of
+    the synthetic countries in the country name cache, so they resolve like real ones
+    """
+
+    from scripts import countries, download_sdr
+
+    rst_gid = f"rst_{fixtures.RST_GID}.csv"
+    tsv_names = download_sdr._read_tsv(data["imf_release.tsv"]).country
+    rst_names = pd.read_csv(io.BytesIO(data[rst_gid])).country
+    names = pd.concat([tsv_names, rst_names]).astype(str).str.strip().unique()
+    codes = dict(zip(names, countries.to_iso3(names)))
+    codes = {n: c for n, c in codes.items() if c != countries.NOT_FOUND}
+
+    countries._names.update(
+        {
+            f"{n} {copy}": f"{c}{copy}"
+            for n, c in codes.items()
+            for copy in range(1, scale)
+        }
+    )
+
+    def scaled_csv(name: str, **columns) -> bytes:
+        df = pd.read_csv(io.BytesIO(data[name]))
+        return _copies(df, scale, **columns).to_csv(index=False).encode()
+
+    return {
+        **data,
+        "imf_release.tsv": _scaled_tsv(data["imf_release.tsv"], scale, codes),
+        "sheet_0.csv": scaled_csv("sheet_0.csv", codes=["iso_code"], names=["country"]),
+        "sheet_1174650744.csv": scaled_csv("sheet_1174650744.csv", codes=["iso_code"]),
+        rst_gid: scaled_csv(rst_gid, names=["country"]),
+        "gdp.csv": scaled_csv("gdp.csv", codes=["iso_code"]),
+    }
+
+
+def _scaled_frames(data: dict, scale: int) -> dict:
+    """Builds the inputs of each target from fixtures scaled with _scaled_fixtures"""
+
+    from scripts import sdr_tracker
+
+    sdr = pd.read_csv(fixtures.PROJECT / "output" / "sdr.csv")
+    rendered = _copies(
+        sdr.drop(columns=["panel_html", "popup_html"]),
+        scale,
+        codes=["iso_code"],
+        names=["country"],
+    )
+    unrendered = rendered.drop(
+        columns=[c for c in rendered.columns if c.endswith("_pct_gdp")] + ["year"]
+    )
+
+    return {
+        "rendered": rendered,
+        "unrendered": unrendered,
+        "references": pd.read_csv(io.BytesIO(data["sheet_1174650744.csv"])),
+        "rst": pd.read_csv(io.BytesIO(data[f"rst_{fixtures.RST_GID}.csv"])),
+        "map_template": _copies(
+            sdr_tracker._africa_map_template(), scale, codes=["iso_code"]
+        ),
+    }
+
+
+def _targets(data: dict, scale: int) -> dict:
+    """Returns the functions to time at a scale, on fixtures scaled with _scaled_fixtures"""
+
+    from scripts import download_sdr, rst, sdr_tracker, utils
+
+    frames = _scaled_frames(data, scale)
+
+    def get_df():
+        download_sdr._get_df("https://www.imf.org/release.tsv", "30 September 2026")
+
+    def update_rst():
+        rst._read_rst_data = lambda grid: frames["rst"]
+        rst.update_rst_timeline_charts()
+
+    def create_sdr_map():
+        sdr_tracker.FINGERPRINT_PATH.unlink(missing_ok=True)
+        sdr_tracker._africa_map_template = lambda: frames["map_template"]
+        sdr_tracker.create_sdr_map()
+
+    targets = {
+        "download_sdr._get_df": get_df,
+        "utils.add_pct_gdp": lambda: utils.add_pct_gdp(
+            frames["unrendered"].copy(),
+            columns=["sdrs_allocation_aug_23_usd", "holdings_usd", "allocations_usd"],
+            gdp_year=2026,
+        ),
+        "sdr_tracker._add_panel_html": lambda: sdr_tracker._add_panel_html(
+            frames["rendered"].copy(), sources_df=frames["references"]
+        ),
+        "sdr_tracker._add_popup_html": lambda: sdr_tracker._add_popup_html(
+            frames["rendered"].copy()
+        ),
+        "rst.update_rst_timeline_charts": update_rst,
+        "sdr_tracker.create_sdr_map": create_sdr_map,
+    }
+
+    return targets
+
+
+def run(
+    scales: tuple = SCALES, repeat: int = 5, targets: Optional[tuple] = None
+) -> dict:
+    """
+    Times every target at every scale, and measures its peak traced memory in a
+    separate run so tracing does not slow down the timings. targets limits the run to
+    some of the target names.
+    Returns the median seconds as {target: {scale: seconds}} and the peak memory
+    as {"target peak_mb": {scale: megabytes}}
+    """
+
+    data = fixtures.load()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _setup(Path(workdir), data)
+        from scripts import sdr_tracker
+
+        # warm the geometry store and the country name cache once
+        sdr_tracker.create_africa_map_template()
+        africa_map_template = sdr_tracker._africa_map_template
+
+        for scale in scales:
+            scaled = _scaled_fixtures(data, scale)
+            _replay(scaled)
+            sdr_tracker._africa_map_template = africa_map_template
+            for name, target in _targets(scaled, scale).items():
+                if targets is not None and name not in targets:
+                    continue
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    target()
+                    timings.append(time.perf_counter() - start)
+                median = statistics.median(timings)
+                results.setdefault(name, {})[str(scale)] = round(median, 5)
+
+                tracemalloc.start()
+                target()
+                peak = tracemalloc.get_traced_memory()[1] / 1024**2
+                tracemalloc.stop()
+                results.setdefault(f"{name} peak_mb", {})[str(scale)] = round(peak, 2)
+                print(
+                    f"{name:<35} {scale:>4}x {median * 1e3:>10.2f} ms {peak:>10.2f} MB"
+                )
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """Returns the (target, scale, baseline, result) entries slower than the baseline"""
+
+    regressions = []
+    for name, timings in results.items():
+        for scale, seconds in timings.items():
+            reference = baseline.get(name, {}).get(scale)
+            if reference is not None and seconds > reference * tolerance:
+                regressions.append((name, scale, reference, seconds))
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--targets", nargs="+")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    if args.compare and not BASELINE_PATH.exists():
+        sys.exit(
+            f"No baseline at {BASELINE_PATH}. "
+            "Run python -m benchmarks.run --save-baseline first"
+        )
+
+    results = run(tuple(args.scales), args.repeat, args.targets)
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2))
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()))
+        for name, scale, reference, value in regressions:
+            if name.endswith(" peak_mb"):
+                print(
+                    f"Regression: {name[:-8]} at {scale}x peaked at {value:.2f} MB "
+                    f"(baseline {reference:.2f} MB)"
+                )
+            else:
+                print(
+                    f"Regression: {name} at {scale}x took {value * 1e3:.2f} ms "
+                    f"(baseline {reference * 1e3:.2f} ms)"
+                )
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,113 @@
+"""Memoized country name -> ISO3 resolution"""
+
+import json
+import threading
+from importlib import metadata
+from pathlib import Path
+
+import pandas as pd
+
+from scripts import config, utils
+
+CACHE_PATH: Path = config.Paths.raw_data / "country_names.json"
+NOT_FOUND: str = "not found"
+# Rows of the IMF releases that are not countries. They are returned as not found
+# without being looked up or reported
+AGGREGATES: tuple = ("Total",)
+
+_names: dict = {}
+_lock = threading.Lock()
+
+
+def _coco_version() -> str:
+    """Returns the installed version of country_converter, without importing it"""
+
+    try:
+        return metadata.version("country_converter")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _seed_names() -> dict:
+    """Builds the name -> ISO3 mapping from the short and official names in coco's data"""
+
+    import country_converter as coco
+
+    df = pd.read_csv(
+        coco.COUNTRY_DATA_FILE,
+        sep="\t",
+        usecols=["name_short", "name_official", "ISO3", "obsolete"],
+    ).loc[lambda d: d.obsolete.isna()]
+
+    names = dict(zip(df.name_official, df.ISO3))
+    names.update(zip(df.name_short, df.ISO3))
+
+    return names
+
+
+def _load_names() -> dict:
+    """Loads the name cache from disk, rebuilding it when coco is updated"""
+
+    if not _names:
+        try:
+            cache = json.loads(CACHE_PATH.read_text())
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get("coco_version") == _coco_version():
+            _names.update(cache["names"])
+        else:
+            _names.update(_seed_names())
+            _save_names()
+
+    return _names
+
+
+def _save_names() -> None:
+    """Writes the name cache to disk"""
+
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    utils.write_atomic(
+        CACHE_PATH,
+        json.dumps(
+            {"coco_version": _coco_version(), "names": _names}, indent=0
+        ).encode(),
+    )
+
+
+def to_iso3(names) -> pd.Series:
+    """
+    Converts country names to ISO3 codes
+    Names are looked up in a persistent cache first and only unknown names go through
+    country_converter. Names that cannot be resolved are reported and returned as "not found".
+    AGGREGATES are returned as "not found" without being reported.
+
+    Parameters:
+        names: list or pd.Series    country names
+    """
+
+    names = pd.Series(names, dtype=object)
+    stripped = (str(n).strip() for n in names.dropna().unique())
+    unique = [n for n in stripped if n not in AGGREGATES]
+
+    with _lock:
+        cache = _load_names()
+        misses = [n for n in unique if n not in cache]
+        if misses:
+            import country_converter as coco
+
+            resolved = coco.convert(misses, to="ISO3", not_found=NOT_FOUND)
+            resolved = [resolved] if isinstance(resolved, str) else resolved
+            # unresolved names are cached as None so coco is not asked again
+            cache.update(
+                {
+                    n: r if isinstance(r, str) and r != NOT_FOUND else None
+                    for n, r in zip(misses, resolved)
+                }
+            )
+            _save_names()
+
+    unresolved = [n for n in unique if cache[n] is None]
+    if unresolved:
+        print(f"Could not resolve country names: {unresolved}")
+
+    return names.astype(str).str.strip().map(cache).fillna(NOT_FOUND).astype(object)
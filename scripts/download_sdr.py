@@ -1,46 +1,99 @@
+import io
+
 import pandas as pd
-from scripts import utils
-import requests
-import country_converter as coco
+from scripts import countries, exchange_rates, fetch, http_cache
 from bs4 import BeautifulSoup
 from datetime import datetime
+from typing import Optional
 
 
-def _find_latest_release(year: int) -> dict:
+def _find_releases(year: int) -> list[dict]:
     """
-    Finds the latest SDR announcement
-    Returns a dictionary with date of announcement and url to the announcement page
+    Finds all SDR announcements for a year, latest first
+    Returns a list of dictionaries with date of announcement and url to the announcement page
 
     parameters:
-        year: int   Specify the year. the url contains a year in the tail. Likely this will change to
-                    2022 once January SDRs are released
+        year: int   Specify the year. the url contains a year in the tail.
     """
 
     base_url = f"https://www.imf.org/external/np/fin/tad/extsdr3.aspx?dateyear={year}"
 
-    content = requests.get(base_url).content
+    content = http_cache.fetch(base_url, ttl=http_cache.TTL["imf_index"])
     soup = BeautifulSoup(content, "html.parser")
     table = soup.find_all("table")[4].find_all("a")
 
-    url = f"https://www.imf.org/external/np/fin/tad/{table[0].get('href')}"
-    date = datetime.strptime(table[0].text, "%B %d, %Y").strftime("%d %B %Y")
+    releases = []
+    for link in table:
+        try:
+            date = datetime.strptime(link.text.strip(), "%B %d, %Y")
+        except ValueError:
+            continue
+        releases.append(
+            {
+                "date": date.strftime("%d %B %Y"),
+                "url": f"https://www.imf.org/external/np/fin/tad/{link.get('href')}",
+            }
+        )
+
+    return releases
 
-    return {
-        "date": date,
-        "url": url,
-    }
+
+def _find_latest_release(year: int) -> dict:
+    """
+    Finds the latest SDR announcement
+    Returns a dictionary with date of announcement and url to the announcement page
+
+    parameters:
+        year: int   Specify the year. the url contains a year in the tail. Likely this will change to
+                    2022 once January SDRs are released
+    """
+
+    return _find_releases(year)[0]
 
 
 def _get_tsv_url(url: str) -> str:
     """retrieves the url for the tsv file"""
 
-    content = requests.get(url).content
+    content = http_cache.fetch(url, ttl=http_cache.TTL["imf_release"])
     soup = BeautifulSoup(content, "html.parser")
     href = soup.find_all("a", text="TSV")[0].get("href")
 
     return f"https://www.imf.org/external/np/fin/tad/{href}"
 
 
+# Non-blank lines before the data: title, date, units and column names
+TSV_HEADER_LINES: int = 4
+
+
+def _read_tsv(content: bytes) -> pd.DataFrame:
+    """
+    Parses an IMF SDR holdings and allocations TSV file in a single pass
+    Returns a dataframe with country, holdings and allocations in SDR millions
+    """
+
+    # find the line where the data starts, skipping blank lines like read_csv does
+    skiprows, header_lines = 0, 0
+    for line in content.splitlines():
+        if header_lines == TSV_HEADER_LINES:
+            break
+        skiprows += 1
+        header_lines += bool(line.strip())
+
+    df = pd.read_csv(
+        io.BytesIO(content),
+        sep="\t",
+        header=None,
+        names=["country", "holdings", "allocations"],
+        skiprows=skiprows,
+        thousands=",",
+        engine="c",
+    )
+    df["holdings"] = round(pd.to_numeric(df["holdings"]) / 1e6, 2)
+    df["allocations"] = round(pd.to_numeric(df["allocations"]) / 1e6, 2)
+
+    return df
+
+
 def _get_df(url: str, date: str) -> pd.DataFrame:
     """
     Returns a cleaned dataframe for the latest SDR release
@@ -50,23 +103,25 @@ def _get_df(url: str, date: str) -> pd.DataFrame:
         date: str   the date of the release
     """
 
-    df = pd.read_csv(url, delimiter="/t", engine="python").loc[3:]
-    df = df["SDR Allocations and Holdings"].str.split("\t", expand=True)
-    df.columns = ["country", "holdings", "allocations"]
-    df["holdings"] = utils.clean_numeric_column(df["holdings"])
-    df["allocations"] = utils.clean_numeric_column(df["allocations"])
-    df["iso_code"] = coco.convert(df.country)
-    df["date"] = date
+    content = http_cache.fetch(url, ttl=http_cache.TTL["imf_tsv"])
+    df = _read_tsv(content)
+    # iso_code and date repeat across rows, so they are kept as categories
+    df["iso_code"] = countries.to_iso3(df.country).astype("category")
+    df["date"] = pd.Categorical([date] * len(df))
     df.drop(columns="country", inplace=True)
     df = df[df.iso_code != "not found"].reset_index(drop=True)
+    df["iso_code"] = df.iso_code.cat.remove_unused_categories()
 
     return df
 
 
-def _add_usd(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+def _add_usd(
+    df: pd.DataFrame, columns: list, exch_df: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """Converts sdr holdings and allocations to USD in new columns"""
 
-    exch_df = utils.read_sheet(116752025)
+    if exch_df is None:
+        exch_df = exchange_rates.latest_rate()
     exch = exch_df.loc[exch_df.indicator == "usd_exchange_rate", "value"].values[0]
 
     for column in columns:
@@ -87,6 +142,42 @@ def _add_pct_used(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def fetch_sources(year: int) -> dict:
+    """
+    Returns the fetch stage sources for the latest SDR release:
+    index page -> release page -> TSV file
+
+    Parameters:
+        year: int   Specify the year. the url contains a year in the tail.
+    """
+
+    return {
+        "imf_release": fetch.Source(lambda: _find_latest_release(year)),
+        "imf_tsv_url": fetch.Source(
+            lambda release: _get_tsv_url(release["url"]), requires=("imf_release",)
+        ),
+        "imf_sdr": fetch.Source(
+            lambda release, url: _get_df(url=url, date=release["date"]),
+            requires=("imf_release", "imf_tsv_url"),
+        ),
+    }
+
+
+def format_sdr(df: pd.DataFrame, exch_df: Optional[pd.DataFrame] = None):
+    """
+    Adds holdings as a % of allocations and USD values to a dataframe returned by _get_df
+
+    Parameters:
+        df: pd.DataFrame        SDR holdings and allocations in SDR millions
+        exch_df: pd.DataFrame   latest exchange rate. Read with exchange_rates.latest_rate if not provided
+    """
+
+    df = _add_pct_used(df)
+    df = _add_usd(df, columns=["holdings", "allocations"], exch_df=exch_df)
+
+    return df
+
+
 def get_latest_sdr(year: int):
     """
     Returns a dataframe with the latest SDR values
@@ -100,7 +191,5 @@ def get_latest_sdr(year: int):
     latest_release = _find_latest_release(year)
     tsv_url = _get_tsv_url(latest_release["url"])
     df = _get_df(url=tsv_url, date=latest_release["date"])
-    df = _add_pct_used(df)
-    df = _add_usd(df, columns=["holdings", "allocations"])
 
-    return df
+    return format_sdr(df)
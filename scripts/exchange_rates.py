@@ -0,0 +1,249 @@
+"""Daily SDR exchange rates for the basket and major currencies, stored as Parquet"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from scripts import config, http_cache, utils
+
+RATES_PATH: Path = config.Paths.raw_data / "exchange_rates"
+FIRST_YEAR: int = 2000
+
+# Latest USD rate, written by update_sdrs.py and read by the tracker update
+LATEST_PATH: Path = config.Paths.glossaries / "exchange_rate.csv"
+EXCHANGE_SHEET: int = 116752025
+# A rate older than this is stale. Rates are only published on business days
+MAX_AGE_DAYS: int = 7
+
+# Currency names used by the IMF -> ISO 4217 codes. The first five make up the SDR basket
+CURRENCIES: dict = {
+    "U.S. dollar": "USD",
+    "Euro": "EUR",
+    "Chinese yuan": "CNY",
+    "Japanese yen": "JPY",
+    "U.K. pound": "GBP",
+    "Australian dollar": "AUD",
+    "Brazilian real": "BRL",
+    "Canadian dollar": "CAD",
+    "Indian rupee": "INR",
+    "Korean won": "KRW",
+    "Mexican peso": "MXN",
+    "Norwegian krone": "NOK",
+    "Russian ruble": "RUB",
+    "Saudi Arabian riyal": "SAR",
+    "Singapore dollar": "SGD",
+    "South African rand": "ZAR",
+    "Swedish krona": "SEK",
+    "Swiss franc": "CHF",
+}
+
+
+def _month_url(month: pd.Period) -> str:
+    """Returns the url of the TSV with the SDRs per currency unit for every day of a month"""
+
+    return (
+        "https://www.imf.org/external/np/fin/data/rms_mth.aspx?"
+        f"SelectDate={month.end_time:%Y-%m-%d}&reportType=SDRCV&tsvflag=Y"
+    )
+
+
+def _month_path(month: pd.Period) -> Path:
+    """Returns the path of the partition holding a month"""
+
+    return RATES_PATH / f"month={month}" / "part-0.parquet"
+
+
+def _read_month(content: bytes) -> pd.DataFrame:
+    """
+    Parses a monthly SDRs per currency unit TSV.
+    The file has one block per half month: a "Currency" header row with the dates,
+    followed by a row of rates per currency.
+    """
+
+    rows, dates = [], None
+    for line in content.decode("utf-8", errors="replace").splitlines():
+        cells = [c.strip() for c in line.split("\t")]
+        if cells[0] == "Currency":
+            dates = pd.to_datetime(cells[1:], format="%B %d, %Y", errors="coerce")
+        elif dates is not None and cells[0] in CURRENCIES:
+            rows.extend(
+                (date, CURRENCIES[cells[0]], value)
+                for date, value in zip(dates, cells[1:])
+            )
+
+    df = pd.DataFrame(rows, columns=["date", "currency", "sdr_per_unit"])
+
+    return (
+        df.assign(
+            sdr_per_unit=lambda d: pd.to_numeric(
+                d.sdr_per_unit.str.replace(",", ""), errors="coerce"
+            )
+        )
+        .dropna()
+        .astype({"currency": "category"})
+        .sort_values(["date", "currency"])
+        .reset_index(drop=True)
+    )
+
+
+def _download_month(month: pd.Period) -> Path:
+    """Downloads one month of rates and writes it to its own partition"""
+
+    content = http_cache.fetch(_month_url(month), ttl=http_cache.TTL["imf_rates"])
+    df = _read_month(content)
+
+    path = _month_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with utils.atomic_path(path) as tmp:
+        df.to_parquet(tmp, index=False)
+
+    return path
+
+
+def update(start_year: int = FIRST_YEAR, max_workers: int = 4) -> list:
+    """
+    Downloads the daily rates of every month since start_year into the store.
+    Stored months are skipped, except the last two, which may have been stored before
+    the month was complete. Returns the months that failed.
+
+    Parameters:
+        start_year: int     first year to download
+        max_workers: int    maximum number of concurrent downloads
+    """
+
+    current = pd.Period(datetime.now(), freq="M")
+    months = pd.period_range(pd.Period(f"{start_year}-01", freq="M"), current)
+    missing = [m for m in months if m >= current - 1 or not _month_path(m).exists()]
+
+    failed = []
+    with http_cache.batch(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_download_month, m): m for m in missing}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as error:
+                print(f"Could not download rates for {futures[future]}: {error}")
+                failed.append(futures[future])
+
+    print(f"Downloaded {len(missing) - len(failed)} of {len(missing)} months of rates")
+
+    return failed
+
+
+def get_rates(
+    currencies: Optional[list] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Returns stored daily rates, sorted by date
+    Columns in dataframe: ['date', 'currency', 'sdr_per_unit']
+
+    Parameters:
+        currencies: list    ISO codes of the currencies to return. Defaults to all
+        start: str          first date to return
+        end: str            last date to return
+    """
+
+    filters = None if currencies is None else [("currency", "in", list(currencies))]
+    df = pd.read_parquet(
+        RATES_PATH, columns=["date", "currency", "sdr_per_unit"], filters=filters
+    ).astype({"currency": "category"})
+    if start is not None:
+        df = df.loc[df.date >= pd.Timestamp(start)]
+    if end is not None:
+        df = df.loc[df.date <= pd.Timestamp(end)]
+
+    return df.sort_values(["date", "currency"]).reset_index(drop=True)
+
+
+def convert(
+    df: pd.DataFrame,
+    columns: list,
+    currency: str = "USD",
+    date_column: str = "date",
+    rates: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Converts SDR columns to a currency at the latest rate on or before each row's date.
+    All rows are converted with a single as-of merge.
+    Adds a column "{column}_{currency}" for each column, in lower case.
+
+    Parameters:
+        df: pd.DataFrame        dataframe with SDR values and a date column
+        columns: list           columns to convert
+        currency: str           ISO code of the currency to convert to
+        date_column: str        column with the date of each row
+        rates: pd.DataFrame     rates as returned by get_rates. Read from the store if not provided
+    """
+
+    if rates is None:
+        rates = get_rates([currency])
+    rates = (
+        rates.loc[rates.currency == currency, ["date", "sdr_per_unit"]]
+        .rename(columns={"date": "_rate_date"})
+        .sort_values("_rate_date")
+    )
+
+    merged = pd.merge_asof(
+        df.assign(_date=pd.to_datetime(df[date_column]), _order=range(len(df)))
+        .sort_values("_date")
+        .reset_index(drop=True),
+        rates,
+        left_on="_date",
+        right_on="_rate_date",
+        direction="backward",
+    ).sort_values("_order")
+
+    rate = merged.sdr_per_unit.values
+    for column in columns:
+        df[f"{column}_{currency.lower()}"] = (merged[column].values / rate).round(2)
+
+    return df
+
+
+def write_latest(df: pd.DataFrame) -> None:
+    """Saves the latest rate, as published to the exchange rate sheet"""
+
+    utils.write_output(LATEST_PATH, df.to_csv(index=False))
+
+
+def _age_days(df: pd.DataFrame) -> float:
+    """Returns the number of days since the date of a rate"""
+
+    date = pd.to_datetime(df.date).max()
+
+    return (pd.Timestamp.now().normalize() - date).days
+
+
+def latest_rate(max_age_days: int = MAX_AGE_DAYS) -> pd.DataFrame:
+    """
+    Returns the latest USD rate, with columns ['indicator', 'value', 'date']
+    The rate saved by the rate job is used first. The exchange rate sheet is only
+    read when that file is missing or stale, and the newest of the two is returned.
+
+    Parameters:
+        max_age_days: int   days after which a rate is stale
+    """
+
+    try:
+        local = pd.read_csv(LATEST_PATH)
+    except (OSError, pd.errors.ParserError):
+        local = None
+    if local is not None and _age_days(local) <= max_age_days:
+        return local
+
+    sheet = utils.read_sheet(EXCHANGE_SHEET)
+    if local is not None and _age_days(local) < _age_days(sheet):
+        sheet = local
+    if _age_days(sheet) > max_age_days:
+        print(f"Exchange rate is stale: last published on {sheet.date.max()}")
+
+    return sheet
+
+
+if __name__ == "__main__":
+    update()
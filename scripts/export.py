@@ -0,0 +1,112 @@
+"""Typed exports of the tracker frame: Parquet, Feather and compact JSON"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts import utils
+
+# Rows written per batch, so large frames are streamed to disk
+CHUNK_ROWS: int = 10_000
+
+# Columns and types of the exported files. Every export has exactly these columns
+SCHEMA: pa.Schema = pa.schema(
+    [
+        ("iso_code", pa.string()),
+        ("flourish_geom", pa.string()),
+        ("country", pa.string()),
+        ("region", pa.string()),
+        ("sdrs_allocation_aug_23_sdr", pa.float64()),
+        ("sdrs_allocation_aug_23_usd", pa.float64()),
+        ("text", pa.string()),
+        ("holdings_sdr", pa.float64()),
+        ("allocations_sdr", pa.float64()),
+        ("date", pa.date32()),
+        ("holdings_pct_allocation", pa.float64()),
+        ("holdings_usd", pa.float64()),
+        ("allocations_usd", pa.float64()),
+        ("year", pa.int16()),
+        ("sdrs_allocation_aug_23_pct_gdp", pa.float64()),
+        ("holdings_pct_gdp", pa.float64()),
+        ("allocations_pct_gdp", pa.float64()),
+        ("panel_html", pa.string()),
+        ("popup_html", pa.string()),
+    ]
+)
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Selects the schema columns and parses release dates like "30 June 2025" """
+
+    return df.filter(SCHEMA.names, axis=1).assign(
+        date=lambda d: pd.to_datetime(d.date, format="%d %B %Y", errors="coerce")
+    )
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Writes a zstd-compressed Parquet file, one row group per chunk of rows"""
+
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+    with pq.ParquetWriter(path, SCHEMA, compression="zstd") as writer:
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+
+
+def _write_feather(df: pd.DataFrame, path: Path) -> None:
+    """Writes a zstd-compressed Feather (Arrow IPC) file, one batch per chunk of rows"""
+
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(str(path), SCHEMA, options=options) as writer:
+        for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+            writer.write_batch(batch)
+
+
+def _write_json(df: pd.DataFrame, path: Path) -> None:
+    """Writes {"columns": [...], "data": [[...], ...]}, one chunk of rows at a time"""
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{{"columns":{json.dumps(SCHEMA.names)},"data":[')
+        for start in range(0, len(df), CHUNK_ROWS):
+            chunk = df.iloc[start : start + CHUNK_ROWS].assign(
+                date=lambda d: d.date.dt.strftime("%Y-%m-%d")
+            )
+            if start:
+                f.write(",")
+            f.write(chunk.to_json(orient="values", double_precision=15)[1:-1])
+        f.write("]}")
+
+
+# Format name -> (file suffix, writer). New formats only need an entry here
+WRITERS: dict = {
+    "parquet": (".parquet", _write_parquet),
+    "feather": (".feather", _write_feather),
+    "json": (".json", _write_json),
+}
+
+
+def write(df: pd.DataFrame, path: Path, formats: tuple = tuple(WRITERS)) -> list[Path]:
+    """
+    Writes a frame in every format, next to each other as path.{suffix}
+    Each file is written atomically with utils.atomic_path, so readers never see a
+    partial file. Returns the paths written.
+
+    Parameters:
+        df: pd.DataFrame    the tracker frame
+        path: Path          path of the files, without suffix
+        formats: tuple      names of the formats in WRITERS
+    """
+
+    typed = _typed(df)
+    written = []
+    for name in formats:
+        suffix, writer = WRITERS[name]
+        file = path.with_suffix(suffix)
+        with utils.atomic_path(file) as tmp:
+            writer(typed, tmp)
+        written.append(file)
+
+    return written
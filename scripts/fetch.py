@@ -0,0 +1,90 @@
+"""Fetch stage: runs the remote inputs of the pipeline as a small dependency graph"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+from scripts import http_client, profiling
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    A remote input of the pipeline
+
+    Parameters:
+        func: Callable      called with the results of `requires`, in order
+        requires: tuple     names of the sources this one depends on
+        timeout: float      seconds allowed for the source. Enforced on its requests
+                            through http_client.deadline, retries included
+    """
+
+    func: Callable
+    requires: tuple = ()
+    timeout: float = 180
+
+
+def _call(name: str, source: Source, args: list):
+    """Calls a source and records its time and rows"""
+
+    with profiling.stage(f"fetch:{name}") as record, http_client.deadline(
+        source.timeout
+    ):
+        result = source.func(*args)
+        if isinstance(result, pd.DataFrame):
+            record["rows"] = len(result)
+
+    return result
+
+
+def run(sources: dict[str, Source], max_workers: int = 8) -> dict:
+    """
+    Runs every source as soon as the sources it requires have finished.
+    Independent sources run in parallel in a thread pool.
+    Returns a dictionary of results keyed by source name.
+    Requests made through http_client stop at the timeout of their source. Sources
+    that download with another client (bblocks for the WEO data) cannot be cancelled:
+    run raises TimeoutError at the timeout, but their thread finishes in the background.
+    """
+
+    unknown = {r for s in sources.values() for r in s.requires} - sources.keys()
+    if unknown:
+        raise ValueError(f"Unknown sources required: {sorted(unknown)}")
+
+    results = {}
+    pending = dict(sources)
+    running = {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+        while pending or running:
+            for name, source in list(pending.items()):
+                if all(r in results for r in source.requires):
+                    args = [results[r] for r in source.requires]
+                    future = pool.submit(_call, name, source, args)
+                    running[future] = (name, time.monotonic() + source.timeout)
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Circular dependency between: {sorted(pending)}")
+
+            deadline = min(d for _, d in running.values())
+            done, _ = wait(
+                running,
+                timeout=max(0, deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                name, _ = running.pop(future)
+                results[name] = future.result()
+
+            for name, deadline in running.values():
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out fetching {name}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -0,0 +1,114 @@
+"""Preprocessed store for the flourish world geometries"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from scripts import config, countries, utils
+
+SOURCE_PATH: Path = config.Paths.glossaries / "flourish_geometries_world.json"
+STORE_DIR: Path = config.Paths.raw_data / "geometries"
+
+# Decimal places kept in the coordinates. None keeps the source geometries unchanged
+GEOMETRY_PRECISION: Optional[int] = None
+
+
+def _round_coordinates(coordinates, precision: int):
+    """Rounds nested GeoJSON coordinates"""
+
+    if isinstance(coordinates, list):
+        return [_round_coordinates(c, precision) for c in coordinates]
+
+    return round(coordinates, precision)
+
+
+def _simplify(geometry: str, precision: int) -> str:
+    """Rounds the coordinates of a GeoJSON geometry string"""
+
+    geometry = json.loads(geometry)
+    geometry["coordinates"] = _round_coordinates(geometry["coordinates"], precision)
+
+    return json.dumps(geometry, separators=(",", ":"))
+
+
+def _store_prefix(precision: Optional[int]) -> str:
+    """Returns the file name prefix of the store for a precision"""
+
+    return "geometries_full" if precision is None else f"geometries_p{precision}"
+
+
+def _store_path(precision: Optional[int]) -> Path:
+    """
+    Returns the path of the store for the current source file.
+    The name changes whenever the source json, country_converter or the precision change
+    """
+
+    key = hashlib.sha256(SOURCE_PATH.read_bytes())
+    key.update(countries._coco_version().encode())
+
+    return STORE_DIR / f"{_store_prefix(precision)}_{key.hexdigest()[:16]}.parquet"
+
+
+def _build_store(path: Path, precision: Optional[int]) -> None:
+    """Parses the source json once and saves iso_code, geometry and continent"""
+
+    # Read in the geometries
+    g = pd.read_json(SOURCE_PATH)
+
+    # Load a dataframe with continent information
+    continents = utils.country_df()
+
+    # Create a dataframe with iso_code and geometry
+    df = (
+        g.rename(columns={g.columns[0]: "flourish_geom", g.columns[1]: "iso_code"})
+        .iloc[1:]
+        .drop_duplicates(subset="iso_code", keep="first")
+        .merge(continents, on="iso_code")
+        .filter(["iso_code", "flourish_geom", "continent"], axis=1)
+        .reset_index(drop=True)
+    )
+    if precision is not None:
+        df["flourish_geom"] = df.flourish_geom.map(lambda s: _simplify(s, precision))
+
+    # write the new store first, so an interrupted run never leaves a partial store at path
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    with utils.atomic_path(path) as tmp:
+        df.to_parquet(tmp, index=False)
+
+    # then remove stores built from previous versions of the source
+    for old_store in STORE_DIR.glob(f"{_store_prefix(precision)}_*.parquet"):
+        if old_store != path:
+            old_store.unlink(missing_ok=True)
+
+
+@lru_cache
+def _load(precision: Optional[int]) -> pd.DataFrame:
+    """Loads the store, building it first if the source has changed"""
+
+    path = _store_path(precision)
+    if not path.exists():
+        _build_store(path, precision)
+
+    return pd.read_parquet(path, memory_map=True)
+
+
+def get_geometries(
+    iso_codes: Optional[list] = None, precision: Optional[int] = GEOMETRY_PRECISION
+) -> pd.DataFrame:
+    """
+    return a dataframe with iso_code, flourish geometries, and continent
+
+    Parameters:
+        iso_codes: list     only return geometries for these countries
+        precision: int      decimal places kept in the coordinates
+    """
+
+    df = _load(precision)
+    if iso_codes is not None:
+        df = df.loc[df.iso_code.isin(iso_codes)]
+
+    return df.reset_index(drop=True).copy()
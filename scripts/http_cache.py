@@ -0,0 +1,199 @@
+"""Persistent on-disk cache for remote inputs, revalidated with conditional GETs"""
+
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from scripts import config, http_client, utils
+
+CACHE_DIR: Path = config.Paths.raw_data / "http_cache"
+MAX_CACHE_BYTES: int = 200 * 1024**2
+# Eviction shrinks the cache to this share of its maximum size, so that a full cache is
+# not scanned again on the next download
+EVICT_TO: float = 0.8
+
+# Seconds a cached response is served without contacting the server, by source.
+# Once the TTL has passed the response is revalidated with ETag/Last-Modified.
+TTL: dict = {
+    "imf_index": 60 * 60,
+    "imf_release": 7 * 24 * 60 * 60,
+    "imf_tsv": 30 * 24 * 60 * 60,
+    "imf_rates": 24 * 60 * 60,
+    "sheet": 0,
+}
+
+# Bytes of cached bodies by cache folder, counted once and then kept up to date
+_sizes: dict = {}
+# Number of open batch() blocks. Eviction waits until the last one ends
+_batches: int = 0
+_lock = threading.Lock()
+
+
+def _cache_paths(url: str, cache_dir: Path) -> tuple[Path, Path]:
+    """Returns the paths to the cached body and metadata for a url"""
+
+    key = hashlib.sha256(url.encode()).hexdigest()
+
+    return cache_dir / f"{key}.body", cache_dir / f"{key}.json"
+
+
+def _read_meta(meta_path: Path) -> Optional[dict]:
+    """Reads the metadata of a cached response, or None if it is missing or corrupt"""
+
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_body(body_path: Path) -> Optional[bytes]:
+    """Reads a cached body, or None if it was evicted in the meantime"""
+
+    try:
+        return body_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _write_meta(meta_path: Path, meta: dict) -> None:
+    """Writes the metadata of a cached response"""
+
+    utils.write_atomic(meta_path, json.dumps(meta).encode())
+
+
+def _evict(cache_dir: Path, max_bytes: int) -> int:
+    """
+    Deletes the least recently used responses until the cache fits in EVICT_TO times
+    max_bytes. Returns the size of the cache afterwards
+    """
+
+    entries = []
+    for meta_path in cache_dir.glob("*.json"):
+        meta = _read_meta(meta_path)
+        body_path = meta_path.with_suffix(".body")
+        if meta is None or not body_path.exists():
+            meta_path.unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            continue
+        entries.append((meta["last_used"], body_path.stat().st_size, meta_path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, meta_path in sorted(entries):
+        if total <= max_bytes * EVICT_TO:
+            break
+        meta_path.with_suffix(".body").unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        total -= size
+
+    return total
+
+
+def _count_size(cache_dir: Path) -> None:
+    """Counts the bodies in a cache the first time it is used in this process"""
+
+    with _lock:
+        if cache_dir not in _sizes:
+            _sizes[cache_dir] = sum(p.stat().st_size for p in cache_dir.glob("*.body"))
+
+
+def _add_size(cache_dir: Path, max_bytes: int, n: int) -> None:
+    """
+    Adds n bytes to the size of a cache, and evicts responses when it is over
+    max_bytes, unless a batch is running. The metadata is only read when evicting.
+    """
+
+    with _lock:
+        _sizes[cache_dir] += n
+        if _batches == 0 and _sizes[cache_dir] > max_bytes:
+            _sizes[cache_dir] = _evict(cache_dir, max_bytes)
+
+
+@contextmanager
+def batch(cache_dir: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+    """
+    Defers eviction to the end of a block that downloads many files, such as a
+    backfill, so the cache is evicted once instead of after every download
+    """
+
+    global _batches
+    with _lock:
+        _batches += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _batches -= 1
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _count_size(cache_dir)
+        _add_size(cache_dir, max_bytes, 0)
+
+
+def fetch(
+    url: str,
+    *,
+    ttl: int = 0,
+    cache_dir: Path = CACHE_DIR,
+    max_bytes: int = MAX_CACHE_BYTES,
+) -> bytes:
+    """
+    Returns the body of a url, going through the on-disk cache
+
+    Responses younger than ttl seconds are served from disk. Older responses are
+    revalidated with If-None-Match/If-Modified-Since, so an unchanged resource
+    costs a single 304 round trip.
+
+    Parameters:
+        url: str            url to fetch
+        ttl: int            seconds a cached response is used without revalidation
+        cache_dir: Path     folder where responses are stored
+        max_bytes: int      size of the cache that triggers least recently used eviction
+    """
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _count_size(cache_dir)
+    body_path, meta_path = _cache_paths(url, cache_dir)
+    # the body is read up front: another thread may evict the entry at any time
+    meta = _read_meta(meta_path)
+    body = _read_body(body_path) if meta is not None else None
+    if body is None:
+        meta = None
+    now = time.time()
+
+    headers = {}
+    if meta is not None:
+        if now - meta["fetched"] < ttl:
+            _write_meta(meta_path, {**meta, "last_used": now})
+            return body
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = http_client.get(url, headers=headers)
+
+    if response.status_code == 304 and meta is not None:
+        _write_meta(meta_path, {**meta, "fetched": now, "last_used": now})
+        return body
+
+    try:
+        previous_size = body_path.stat().st_size
+    except FileNotFoundError:
+        previous_size = 0
+    utils.write_atomic(body_path, response.content)
+    _write_meta(
+        meta_path,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched": now,
+            "last_used": now,
+        },
+    )
+    _add_size(cache_dir, max_bytes, len(response.content) - previous_size)
+
+    return response.content
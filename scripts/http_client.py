@@ -0,0 +1,161 @@
+"""Shared HTTP client: pooled keep-alive connections, timeouts and retries with backoff"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts import profiling
+
+# Seconds to wait for a connection, and between bytes of the response
+TIMEOUT: tuple = (10, 60)
+# Retries after a network error or a retryable status, with exponential backoff
+RETRIES: int = 3
+BACKOFF: float = 1.0
+RETRY_STATUSES: tuple = (429, 500, 502, 503, 504)
+# Connections kept alive per host
+POOL_SIZE: int = 8
+CHUNK_SIZE: int = 64 * 1024
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class Response:
+    """A downloaded response"""
+
+    url: str
+    status_code: int
+    headers: Mapping
+    content: bytes
+
+
+def _get_session() -> requests.Session:
+    """Returns the session shared by every request, creating it on first use"""
+
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+
+    return _session
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Limits the total time of the requests made by this thread in the block, retries
+    included. Requests still running at the deadline raise requests.Timeout.
+    """
+
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = time.monotonic() + seconds
+    if previous is not None:
+        _local.deadline = min(_local.deadline, previous)
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def _remaining(url: str) -> Optional[float]:
+    """Returns the seconds left before the deadline, or None when there is none"""
+
+    end = getattr(_local, "deadline", None)
+    if end is None:
+        return None
+    remaining = end - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout(f"Deadline exceeded fetching {url}")
+
+    return remaining
+
+
+def _download(
+    session: requests.Session, url: str, headers: Optional[dict], timeout: tuple
+) -> tuple[requests.Response, bytes]:
+    """Streams a response body, stopping at the deadline"""
+
+    remaining = _remaining(url)
+    if remaining is not None:
+        timeout = tuple(min(t, remaining) for t in timeout)
+
+    chunks = []
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            chunks.append(chunk)
+            _remaining(url)
+
+    return response, b"".join(chunks)
+
+
+def _backoff(attempt: int) -> float:
+    """Returns the seconds to wait before a retry: exponential, with full jitter"""
+
+    return random.uniform(0, BACKOFF * 2**attempt)
+
+
+def get(
+    url: str,
+    *,
+    headers: Optional[dict] = None,
+    timeout: tuple = TIMEOUT,
+    retries: int = RETRIES,
+) -> Response:
+    """
+    Downloads a url through the shared connection pool
+    Network errors and 429/5xx responses are retried with exponential backoff and
+    jitter. The body is streamed in chunks, and the timing of each request is
+    added to the run report. Raises requests.HTTPError for other 4xx responses,
+    or when the retries are exhausted, and requests.Timeout at the deadline set
+    with `deadline`.
+
+    Parameters:
+        url: str            url to download
+        headers: dict       request headers
+        timeout: tuple      connect and read timeouts in seconds
+        retries: int        number of retries
+    """
+
+    session = _get_session()
+    start = time.perf_counter()
+
+    for attempt in range(retries + 1):
+        try:
+            response, content = _download(session, url, headers, timeout)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(min(_backoff(attempt), _remaining(url) or float("inf")))
+
+    profiling.add_bytes(len(content))
+    profiling.add_request(
+        {
+            "host": urlparse(url).netloc,
+            "status": response.status_code,
+            "seconds": round(time.perf_counter() - start, 4),
+            "bytes": len(content),
+            "attempts": attempt + 1,
+        }
+    )
+    response.raise_for_status()
+
+    return Response(
+        url=url,
+        status_code=response.status_code,
+        headers=response.headers,
+        content=content,
+    )
@@ -5,59 +5,115 @@ Created on Fri Dec 17 11:40:41 2021
 @author: LucaPicci
 """
 
-import requests
-from typing import Optional
+import datetime
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
 import pandas as pd
 from scripts import config
-from bblocks import set_bblocks_data_path, WorldEconomicOutlook
 
-set_bblocks_data_path(config.Paths.raw_data)
+GDP_PATH = config.Paths.raw_data / "gdp"
+# WEO release names, as returned by bblocks for the latest vintage
+RELEASES: dict = {"April": 1, "October": 2}
+# While the expected vintage is not published, the stored one is used for this long
+RECHECK_SECONDS: int = 24 * 60 * 60
 # ============================================================================
 # WEO tools
 # ============================================================================
 
 
-def _clean_weo(df: pd.DataFrame) -> pd.DataFrame:
-    """cleans and formats weo dataframe"""
-
-    columns = names = {
-        "ISO": "iso_code",
-        "WEO Subject Code": "indicator",
-        "Subject Descriptor": "indicator_name",
-        "Units": "units",
-        "Scale": "scale",
-    }
-    cols_to_drop = [
-        "WEO Country Code",
-        "Country",
-        "Subject Notes",
-        "Country/Series-specific Notes",
-        "Estimates Start After",
-    ]
+def _vintage(year: int, release: Union[int, str]) -> str:
+    """
+    Returns a WEO vintage as "{year}_{release}", where release 1 is April and
+    release 2 is October. release can also be given as "April" or "October"
+    """
+
+    return f"{year}_{RELEASES.get(release, release)}"
+
+
+def _gdp_path(vintage: str) -> Path:
+    """Returns the path of the stored GDP table of a WEO vintage"""
+
+    return GDP_PATH / f"ngdpd_{vintage}.parquet"
+
+
+def _weo_vintage(today: Optional[datetime.date] = None) -> str:
+    """Returns the latest expected WEO vintage, see _vintage"""
+
+    if today is None:
+        today = datetime.date.today()
+
+    if today.month < 4:
+        return _vintage(today.year - 1, 2)
+    if today.month < 10:
+        return _vintage(today.year, 1)
+
+    return _vintage(today.year, 2)
+
+
+def _recent_table() -> Optional[Path]:
+    """Returns the newest stored GDP table if it was loaded within RECHECK_SECONDS"""
+
+    stored = sorted(GDP_PATH.glob("ngdpd_*.parquet"), key=lambda p: p.stat().st_mtime)
+    if stored and time.time() - stored[-1].stat().st_mtime < RECHECK_SECONDS:
+        return stored[-1]
+
+    return None
+
+
+@lru_cache
+def _gdp_table(vintage: str) -> pd.DataFrame:
+    """
+    Returns a compact iso_code, year, gdp table for a WEO vintage, with iso_code as a
+    category and year as int16. The table is stored on disk, so the full WEO dataset
+    is only loaded once per vintage
+    """
+
+    path = _gdp_path(vintage)
+    if not path.exists():
+        # the expected vintage may not be published yet, see below
+        path = _recent_table()
+    if path is not None:
+        return pd.read_parquet(path)
+
+    # bblocks loads its whole WEO machinery, so it is only imported when a vintage is missing
+    from bblocks import set_bblocks_data_path, WorldEconomicOutlook
+
+    set_bblocks_data_path(config.Paths.raw_data)
+    weo = WorldEconomicOutlook()
+    weo.load_data("NGDPD")
     df = (
-        df.drop(cols_to_drop, axis=1)
-        .rename(columns=columns)
-        .melt(id_vars=names.values(), var_name="year", value_name="value")
-    )
-    df.value = df.value.map(
-        lambda x: (str(x).strip().replace(",", "").replace("--", ""))
+        weo.get_data()
+        .filter(["iso_code", "year", "value"], axis=1)
+        .assign(year=lambda d: d.year.dt.year, gdp=lambda d: d.value * 1e9)
+        .drop(columns="value")
+        .astype({"iso_code": "category", "year": "int16"})
+        .reset_index(drop=True)
     )
-    df.year = pd.to_numeric(df.year)
-    df.value = pd.to_numeric(df.value, errors="coerce")
+
+    # the latest release may not be published yet, in which case WEO returns the previous
+    # one. It is stored under its own vintage and used until RECHECK_SECONDS have passed
+    path = _gdp_path(vintage)
+    if getattr(weo, "year", None) and getattr(weo, "release", None):
+        path = _gdp_path(_vintage(weo.year, weo.release))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, index=False)
 
     return df
 
 
-def get_gdp(gdp_year: int) -> pd.DataFrame:
+def get_gdp(gdp_year: Union[int, list]) -> pd.DataFrame:
     """
-    Retrieves gdp value for a specific year
+    Retrieves gdp values for a specific year, or a list of years
     """
-    weo = WorldEconomicOutlook()
-    weo.load_data("NGDPD")
+    years = [gdp_year] if isinstance(gdp_year, int) else list(gdp_year)
 
     return (
-        weo.get_data()
-        .assign(year=lambda d: d.year.dt.year, value=lambda d: d.value * 1e9)
-        .query(f"year == {gdp_year}")
-        .rename(columns={"value": "gdp"})
+        _gdp_table(_weo_vintage())
+        .loc[lambda d: d.year.isin(years)]
+        .assign(indicator="NGDPD")
+        .filter(["iso_code", "indicator", "year", "gdp"], axis=1)
+        .reset_index(drop=True)
     )
@@ -0,0 +1,180 @@
+"""Stage-level timing, download and memory instrumentation for the pipelines"""
+
+import cProfile
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from scripts import config
+
+REPORT_PATH: Path = config.Paths.output / "run_report.jsonl"
+PROFILES_PATH: Path = config.Paths.raw_data / "profiles"
+MODES: tuple = ("cprofile", "tracemalloc")
+
+_stages: list = []
+_lock = threading.Lock()
+_local = threading.local()
+_run: dict = {}
+
+
+def _max_rss_mb() -> Optional[float]:
+    """Returns the peak resident memory of the process, where the platform reports it"""
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Records wall time, bytes downloaded and memory for a block of code.
+    Yields the stage record, so callers can add the number of rows processed.
+    In tracemalloc mode, peak_memory_mb is the traced peak of the stage. Otherwise
+    rss_growth_mb is how much the stage raised the peak resident memory of the
+    process: 0 when it stayed below an earlier peak. Stages running at the same time
+    in other threads count towards it too.
+    """
+
+    record = {"stage": name, "seconds": None, "bytes": 0, "rows": None}
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(record)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    rss_start = _max_rss_mb()
+    start = time.perf_counter()
+
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        if tracing:
+            record["peak_memory_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024**2, 1
+            )
+        elif rss_start is not None:
+            record["rss_growth_mb"] = round(_max_rss_mb() - rss_start, 1)
+        stack.pop()
+        with _lock:
+            _stages.append(record)
+
+
+def timed(name: str):
+    """Decorator recording a function as a stage. Returned dataframes count as rows"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    record["rows"] = len(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def collect(func, *args):
+    """
+    Calls func in a worker process and returns its result with the stages it
+    recorded, so the parent can add them to its report with add_stages
+    """
+
+    # workers forked from the parent start with a copy of its stages
+    with _lock:
+        _stages.clear()
+    result = func(*args)
+    with _lock:
+        stages = list(_stages)
+        _stages.clear()
+
+    return result, stages
+
+
+def add_stages(stages: list, prefix: str = "") -> None:
+    """Adds stages recorded in a worker process to the run, with prefix added to their names"""
+
+    with _lock:
+        _stages.extend({**s, "stage": f"{prefix}{s['stage']}"} for s in stages)
+
+
+def add_bytes(n: int) -> None:
+    """Adds downloaded bytes to the run and to every stage running in the current thread"""
+
+    for record in getattr(_local, "stack", []):
+        record["bytes"] += n
+    with _lock:
+        _run["bytes"] = _run.get("bytes", 0) + n
+
+
+def add_request(request: dict) -> None:
+    """Records the timing of an HTTP request in the run report"""
+
+    with _lock:
+        _run.setdefault("requests", []).append(request)
+
+
+def start(mode: Optional[str] = None) -> None:
+    """
+    Starts a run. mode can be "cprofile" or "tracemalloc" to also dump a profile
+    of the run to raw_data/profiles
+    """
+
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Unknown profiling mode: {mode}. Choose from {MODES}")
+
+    with _lock:
+        _stages.clear()
+    _run.clear()
+    _run.update({"started": datetime.now(), "mode": mode, "start": time.perf_counter()})
+
+    if mode == "cprofile":
+        _run["profiler"] = cProfile.Profile()
+        _run["profiler"].enable()
+    elif mode == "tracemalloc":
+        tracemalloc.start()
+
+
+def finish(report_path: Path = REPORT_PATH) -> dict:
+    """Ends a run, appends its report to run_report.jsonl and returns it"""
+
+    stamp = _run["started"].strftime("%Y%m%d_%H%M%S")
+    if _run["mode"] is not None:
+        PROFILES_PATH.mkdir(parents=True, exist_ok=True)
+    if _run["mode"] == "cprofile":
+        _run["profiler"].disable()
+        _run["profiler"].dump_stats(PROFILES_PATH / f"{stamp}.prof")
+    elif _run["mode"] == "tracemalloc":
+        tracemalloc.take_snapshot().dump(str(PROFILES_PATH / f"{stamp}.tracemalloc"))
+        tracemalloc.stop()
+
+    with _lock:
+        stages = list(_stages)
+    report = {
+        "run": _run["started"].isoformat(timespec="seconds"),
+        "seconds": round(time.perf_counter() - _run["start"], 4),
+        "bytes": _run.get("bytes", 0),
+        "peak_memory_mb": _max_rss_mb(),
+        "mode": _run["mode"],
+        "stages": stages,
+        "requests": _run.get("requests", []),
+    }
+    with open(report_path, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+    return report
@@ -1,11 +1,21 @@
 """RST"""
 
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-import country_converter as coco
 from csv import writer
 from datetime import datetime
 
-from scripts import config
+from scripts import config, countries, http_cache, utils
+
+TIMELINE_PATH: Path = config.Paths.output / "rst_timeline"
+# Every timeline in one file, and the hash of each per-country file
+BUNDLE_PATH: Path = config.Paths.output / "rst_timeline.json"
+MANIFEST_PATH: Path = config.Paths.output / "rst_manifest.json"
 
 
 def _read_rst_data(grid: int) -> pd.DataFrame:
@@ -17,22 +27,83 @@ def _read_rst_data(grid: int) -> pd.DataFrame:
         f"gid={grid}&single=true&output=csv"
     )
 
-    return pd.read_csv(URL)
+    content = http_cache.fetch(URL, ttl=http_cache.TTL["sheet"])
+
+    return pd.read_csv(io.BytesIO(content))
+
+
+def _write_if_changed(path: Path, content: str, compression: tuple = ()) -> bool:
+    """Writes a file atomically, unless its content hash is unchanged. Returns True if written"""
+
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if path.exists() and hashlib.sha256(path.read_bytes()).hexdigest() == digest:
+        return False
+    utils.write_output(path, content, compression)
+
+    return True
+
+
+def _write_bundle(groups: dict, files: dict) -> None:
+    """
+    Writes every timeline to rst_timeline.json (and .json.gz), so the site can load them
+    in one request, and rst_manifest.json with the hash of each per-country csv, so a
+    client can fetch only the timelines that changed
+    """
+
+    columns = next(iter(groups.values())).columns.tolist() if groups else []
+    timelines = {
+        path.stem: group.astype(object).where(group.notna(), None).values.tolist()
+        for path, group in sorted(groups.items())
+    }
+    bundle = json.dumps(
+        {"columns": columns, "timelines": timelines}, separators=(",", ":")
+    )
+    _write_if_changed(BUNDLE_PATH, bundle, compression=("gzip",))
+
+    manifest = {
+        "bundle": BUNDLE_PATH.name,
+        "key": "iso_code",
+        "timelines": {
+            path.stem: {
+                "file": f"{TIMELINE_PATH.name}/{path.name}",
+                "hash": hashlib.sha256(content.encode("utf-8")).hexdigest()[:12],
+                "rows": len(groups[path]),
+            }
+            for path, content in sorted(files.items())
+        },
+    }
+    _write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2))
 
 
-def update_rst_timeline_charts():
-    """Update RST timeline charts"""
+def update_rst_timeline_charts(max_workers: int = 1) -> list[Path]:
+    """
+    Update RST timeline charts, one csv per country, plus the bundle and manifest
+    Files whose content has not changed are left untouched.
+    Returns the paths of the files written.
+
+    Parameters:
+        max_workers: int    number of threads writing files. 1 writes them in turn
+    """
 
     df = _read_rst_data(1296770218)
-    for country in df.country.unique():
-        (
-            df.loc[df["country"] == country].to_csv(
-                config.Paths.output
-                / "rst_timeline"
-                / f'{coco.convert(country, to="ISO3")}.csv',
-                index=False,
-            )
-        )
+    iso_codes = countries.to_iso3(df.country).values
+    groups = {
+        TIMELINE_PATH / f"{iso_code}.csv": group
+        for iso_code, group in df.groupby(iso_codes, sort=False)
+    }
+    files = {path: group.to_csv(index=False) for path, group in groups.items()}
+
+    TIMELINE_PATH.mkdir(parents=True, exist_ok=True)
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            written = list(pool.map(_write_if_changed, files, files.values()))
+    else:
+        written = [_write_if_changed(path, content) for path, content in files.items()]
+
+    print(f"Updated {sum(written)} of {len(files)} RST timelines")
+    _write_bundle(groups, files)
+
+    return [path for path, changed in zip(files, written) if changed]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+"""Historical SDR holdings and allocations, stored as a partitioned Parquet dataset"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from scripts import config, download_sdr, exchange_rates, http_cache, utils
+
+HISTORY_PATH: Path = config.Paths.raw_data / "sdr_history"
+FIRST_YEAR: int = 2000
+
+
+def _release_path(release: dict) -> Path:
+    """Returns the path of the partition holding a release"""
+
+    date = datetime.strptime(release["date"], "%d %B %Y")
+
+    return HISTORY_PATH / f"date={date:%Y-%m-%d}" / "part-0.parquet"
+
+
+def _download_release(release: dict) -> Path:
+    """Downloads one release and writes it to its own partition"""
+
+    tsv_url = download_sdr._get_tsv_url(release["url"])
+    df = (
+        download_sdr._get_df(url=tsv_url, date=release["date"])
+        .drop(columns="date")
+        .sort_values("iso_code")
+        .reset_index(drop=True)
+    )
+
+    path = _release_path(release)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with utils.atomic_path(path) as tmp:
+        df.to_parquet(tmp, index=False)
+
+    return path
+
+
+def backfill(
+    start_year: int = FIRST_YEAR,
+    end_year: Optional[int] = None,
+    max_workers: int = 4,
+) -> list[dict]:
+    """
+    Downloads every SDR release between start_year and end_year into the history store.
+    Releases already in the store are skipped, so a failed run can simply be repeated.
+    Returns the releases that failed.
+
+    Parameters:
+        start_year: int     first year to crawl
+        end_year: int       last year to crawl. Defaults to the current year
+        max_workers: int    maximum number of concurrent downloads
+    """
+
+    if end_year is None:
+        end_year = datetime.now().year
+
+    failed = []
+    releases, missing = [], []
+    with http_cache.batch(), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        year_futures = {
+            pool.submit(download_sdr._find_releases, year): year
+            for year in range(start_year, end_year + 1)
+        }
+        for future in as_completed(year_futures):
+            try:
+                releases.extend(future.result())
+            except Exception as error:
+                print(f"Could not list releases for {year_futures[future]}: {error}")
+                failed.append({"year": year_futures[future]})
+
+        releases = list({_release_path(r): r for r in releases}.values())
+        missing = [r for r in releases if not _release_path(r).exists()]
+        release_futures = {pool.submit(_download_release, r): r for r in missing}
+        for future in as_completed(release_futures):
+            try:
+                future.result()
+            except Exception as error:
+                release = release_futures[future]
+                print(f"Could not download release {release['date']}: {error}")
+                failed.append(release)
+
+    downloaded = len(missing) - sum("url" in r for r in failed)
+    print(
+        f"Downloaded {downloaded} of {len(missing)} missing releases "
+        f"({len(releases) - len(missing)} already stored)"
+    )
+
+    return failed
+
+
+def get_history(
+    iso_code: Optional[str] = None, currency: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Returns SDR holdings and allocations for every stored release
+    Columns in dataframe: ['iso_code', 'holdings', 'allocations', 'date']
+
+    Parameters:
+        iso_code: str   only return the history of this country
+        currency: str   also convert holdings and allocations to this currency, at the
+                        rate of each release date (e.g. "USD")
+    """
+
+    filters = None if iso_code is None else [("iso_code", "==", iso_code)]
+
+    df = (
+        pd.read_parquet(
+            HISTORY_PATH,
+            columns=["iso_code", "holdings", "allocations", "date"],
+            filters=filters,
+        )
+        .astype({"iso_code": "category"})
+        .assign(date=lambda d: pd.to_datetime(d.date.astype(str)))
+        .sort_values(["iso_code", "date"])
+        .reset_index(drop=True)
+    )
+    if currency is not None:
+        df = exchange_rates.convert(df, ["holdings", "allocations"], currency)
+
+    return df
+
+
+if __name__ == "__main__":
+    backfill()
@@ -5,14 +5,56 @@ Created on Fri Dec  3 10:30:41 2021
 @author: LucaPicci
 """
 
-import numpy as np
+import hashlib
+import json
+import shutil
+
 import pandas as pd
-from bblocks import set_bblocks_data_path
 
-from scripts import config, download_sdr, utils
+from scripts import (
+    config,
+    download_sdr,
+    exchange_rates,
+    export,
+    fetch,
+    geometry,
+    imf,
+    profiling,
+    utils,
+)
 import datetime
-
-set_bblocks_data_path(config.Paths.raw_data)
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+FINGERPRINT_PATH: Path = config.Paths.glossaries / "sdr_fingerprint.json"
+
+# Also write the geometry as its own content-hashed file, next to a slim data file
+SPLIT_GEOMETRY: bool = True
+# Pre-compressed variants of the split files: "gzip" and/or "brotli"
+COMPRESSION: tuple = ("gzip",)
+# Write each country's panel to its own content-hashed file, loaded when it is clicked,
+# and keep only the popup in sdr_data.csv
+PANEL_FRAGMENTS: bool = True
+# Typed copies of sdr.csv written next to it, see export.WRITERS
+EXPORT_FORMATS: tuple = ("parquet", "feather", "json")
+# Text columns of the tracker frame kept as categories. The release date is already one
+CATEGORY_COLUMNS: tuple = ("iso_code", "country", "region")
+
+# Regions built by create_sdr_map(regions=REGIONS), as country_df column filters or ISO3 lists.
+# Income groups such as LICs are not in country_converter, so they are given as ISO3 lists.
+# The Africa map is the main map in output, so it is not repeated here. Regions without
+# any country in the tracker sheet are skipped
+REGIONS: dict = {
+    # World Bank low-income economies, FY2025 classification
+    "lics": (
+        "AFG BDI BFA CAF COD ERI ETH GMB GNB LBR MDG MLI MOZ "
+        "MWI NER PRK RWA SDN SLE SOM SSD SYR TCD TGO UGA YEM"
+    ).split(),
+    "asia": {"continent": "Asia"},
+    "americas": {"continent": "America"},
+    "world": {},
+}
 
 
 # ============================================================================
@@ -20,35 +62,49 @@ set_bblocks_data_path(config.Paths.raw_data)
 # ============================================================================
 
 
-def __geometry_df() -> pd.DataFrame:
+def _region_codes(region) -> list:
     """
-    return a dataframe with iso_code, flourish geometries, and continent
+    Returns the ISO3 codes of a region
+    A region is either a list of ISO3 codes, or a dictionary of values to match in
+    utils.country_df columns, e.g. {"continent": "Africa"}. {} is the whole world.
     """
-    # Read in the geometries
-    g = pd.read_json(config.Paths.glossaries / "flourish_geometries_world.json")
 
-    # Load a dataframe with continent information
-    continents = utils.country_df()
+    if isinstance(region, (list, tuple)):
+        return list(region)
+
+    df = utils.country_df(columns=["ISO3", *region])
+    for column, value in region.items():
+        df = df.loc[df[column] == value]
+
+    return df.iso_code.tolist()
+
+
+def _world_map_template() -> pd.DataFrame:
+    """Returns iso_code and flourish geometry for every country"""
+
+    return geometry.get_geometries().drop("continent", axis=1)
+
+
+def _africa_map_template() -> pd.DataFrame:
+    """Returns iso_code and flourish geometry for African countries"""
 
-    # Create a dataframe with iso_code and geometry
     return (
-        g.rename(columns={g.columns[0]: "flourish_geom", g.columns[1]: "iso_code"})
-        .iloc[1:]
-        .drop_duplicates(subset="iso_code", keep="first")
-        .merge(continents, on="iso_code")
-        .filter(["iso_code", "flourish_geom", "continent"], axis=1)
+        geometry.get_geometries()
+        .loc[lambda d: d.continent == "Africa"]
+        .drop("continent", axis=1)
         .reset_index(drop=True)
     )
 
 
+@profiling.timed("map_template")
 def create_africa_map_template() -> None:
     """
     Creates template for a flourish map of Africa
     with country name and geometry output as dataframe saved to glossaries
     """
-    __geometry_df().loc[lambda d: d.continent == "Africa"].drop(
-        "continent", axis=1
-    ).to_csv(f"{config.Paths.glossaries}/map_template.csv", index=False)
+    _africa_map_template().to_csv(
+        f"{config.Paths.glossaries}/map_template.csv", index=False
+    )
 
 
 # ============================================================================
@@ -56,74 +112,92 @@ def create_africa_map_template() -> None:
 # ============================================================================
 
 
-def __sources(df, source_df, i) -> str:
+def _as_str(column: pd.Series) -> pd.Series:
+    """Formats every value in a column the same way an f-string would"""
+
+    return column.astype(str)
+
+
+def __sources(df: pd.DataFrame, source_df: pd.DataFrame) -> pd.Series:
     """Creates an HTML string for references or returns null if no sources are listed"""
 
-    iso_code = df.loc[i, "iso_code"]
-    if len(source_df[source_df.iso_code == iso_code]) > 0:
-        sources = "<br><p><strong>References</strong></p><br>"
-        for indx in source_df[source_df.iso_code == iso_code].index:
-            source_name = source_df.loc[indx, "sources"]
-            source_link = source_df.loc[indx, "link"]
-            sources += (
-                f'<p><a href="{source_link}" target="_blank">{source_name}</a></p>'
-            )
-    else:
-        sources = np.nan
+    links = (
+        '<p><a href="'
+        + _as_str(source_df.link)
+        + '" target="_blank">'
+        + _as_str(source_df.sources)
+        + "</a></p>"
+    )
+    references = "<br><p><strong>References</strong></p><br>" + links.groupby(
+        source_df.iso_code, sort=False
+    ).agg("".join)
+
+    return df.iso_code.map(references).astype(object)
 
-    return sources
 
+def _pct_used_html(df: pd.DataFrame, spacing: str) -> pd.Series:
+    """Creates an HTML string for SDR holdings as a % of cumulative allocations"""
+
+    return (
+        '<br><p style="text-align:left;"><strong>SDR holdings</strong>: '
+        + spacing
+        + "<strong>"
+        + _as_str(df.holdings_pct_allocation)
+        + " % of cumulative allocations</strong></p>"
+        '<p style="text-align:left;"><i>as of ' + _as_str(df.date) + "</i></p><br>"
+    )
 
-def __sdr_table(df: pd.DataFrame, i: int) -> str:
+
+def __sdr_table(df: pd.DataFrame) -> pd.Series:
     """Creates an HTML string for SDR holdings and allocation"""
 
     # August allocations
-    allocation_aug_usd = df.loc[i, "sdrs_allocation_aug_23_usd"]
-    allocation_aug_sdr = df.loc[i, "sdrs_allocation_aug_23_sdr"]
-    allocation_aug_gdp = df.loc[i, "sdrs_allocation_aug_23_pct_gdp"]
-
     allocation_aug_html = (
-        f'<tr><td style="text-align:left"><strong>SDR allocations</strong>'
-        f"<sup>1</sup><br><i>on 23 August 2021</i></td>"
-        f'<td style="text-align:center">{allocation_aug_usd}</td>'
-        f'<td style="text-align:center">{allocation_aug_sdr}'
-        f'</td><td style="text-align:center">{allocation_aug_gdp}</td></tr>'
+        '<tr><td style="text-align:left"><strong>SDR allocations</strong>'
+        "<sup>1</sup><br><i>on 23 August 2021</i></td>"
+        '<td style="text-align:center">'
+        + _as_str(df.sdrs_allocation_aug_23_usd)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.sdrs_allocation_aug_23_sdr)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.sdrs_allocation_aug_23_pct_gdp)
+        + "</td></tr>"
     )
 
     # Cumulative allocations
-    allocation_usd = df.loc[i, "allocations_usd"]
-    allocation_sdr = df.loc[i, "allocations_sdr"]
-    allocation_date = df.loc[i, "date"]
-    allocation_gdp = df.loc[i, "allocations_pct_gdp"]
-
     allocation_html = (
-        f'<tr><td style="text-align:left"><strong>Cumulative SDR allocations</strong>'
-        f"<sup>2</sup><br><i>as of {allocation_date}</i></td>"
-        f'<td style="text-align:center">{allocation_usd}</td>'
-        f'<td style="text-align:center">{allocation_sdr}</td>'
-        f'<td style="text-align:center">{allocation_gdp}</td></tr>'
+        '<tr><td style="text-align:left"><strong>Cumulative SDR allocations</strong>'
+        "<sup>2</sup><br><i>as of "
+        + _as_str(df.date)
+        + '</i></td><td style="text-align:center">'
+        + _as_str(df.allocations_usd)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.allocations_sdr)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.allocations_pct_gdp)
+        + "</td></tr>"
     )
 
     # Current holdings
-    holdings_usd = df.loc[i, "holdings_usd"]
-    holdings_sdr = df.loc[i, "holdings_sdr"]
-    holdings_date = df.loc[i, "date"]
-    holdings_gdp = df.loc[i, "holdings_pct_gdp"]
-
     holding_html = (
-        f'<tr><td style="text-align:left"><strong>Current SDR holdings</strong>'
-        f"<br><i>as of {holdings_date}</i></td>"
-        f'<td style="text-align:center">{holdings_usd}</td>'
-        f'<td style="text-align:center">{holdings_sdr}</td>'
-        f'<td style="text-align:center">{holdings_gdp}</td></tr>'
+        '<tr><td style="text-align:left"><strong>Current SDR holdings</strong>'
+        "<br><i>as of "
+        + _as_str(df.date)
+        + '</i></td><td style="text-align:center">'
+        + _as_str(df.holdings_usd)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.holdings_sdr)
+        + '</td><td style="text-align:center">'
+        + _as_str(df.holdings_pct_gdp)
+        + "</td></tr>"
     )
 
     # SDR holdings Table
     table = (
-        f'<br><table><tr><th></th><th style="text-align:center">USD millions</th>'
-        f'<th style="text-align:center">SDR millions</th>'
-        f'<th style="text-align:center">SDR as % of GDP</th>'
-        f"</tr>{allocation_aug_html}{allocation_html}{holding_html} </table>"
+        '<br><table><tr><th></th><th style="text-align:center">USD millions</th>'
+        '<th style="text-align:center">SDR millions</th>'
+        '<th style="text-align:center">SDR as % of GDP</th>'
+        "</tr>" + allocation_aug_html + allocation_html + holding_html + " </table>"
         "<br><p><i><sup>1</sup>USD values for 23 August 2021 are calculated using the exchange "
         "rate from 23 August"
         " - 1 USD: 0.705 SDRs</i></p>"
@@ -152,83 +226,221 @@ def __null_message(df: pd.DataFrame, column: str) -> pd.DataFrame:
 def __country_name(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """Adds country name to the beginning of the html string"""
 
-    for i in df.index:
-        country = df.loc[i, "country"]
-        html = df.loc[i, column]
-        df.loc[i, column] = (
-            f'<h1 style="text-align:center"><strong>{country}</strong></h1>{html}'
-        )
+    df[column] = (
+        '<h1 style="text-align:center"><strong>'
+        + _as_str(df.country)
+        + "</strong></h1>"
+        + _as_str(df[column])
+    )
 
     return df
 
 
-def _add_panel_html(df: pd.DataFrame) -> pd.DataFrame:
+@profiling.timed("render:panel_html")
+def _add_panel_html(
+    df: pd.DataFrame, sources_df: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """Creates the HTML code for the panel"""
 
-    sources_df = utils.read_sheet(1174650744)
-    df["panel_html"] = np.nan
+    if sources_df is None:
+        sources_df = utils.read_sheet(1174650744)
+    has_text = df.text.notna()
+    sources = __sources(df, sources_df)
 
-    for i in df.index:
-        holdings_pct_allocation = df.loc[i, "holdings_pct_allocation"]
-        holdings_pct_allocation_date = df.loc[i, "date"]
-        pct_used_text = (
-            '<br><p style="text-align:left;"><strong>SDR holdings</strong>: &emsp;&emsp;&emsp;'
-            f"<strong>{holdings_pct_allocation} % of cumulative allocations</strong></p>"
-            f'<p style="text-align:left;"><i>as of {holdings_pct_allocation_date}</i></p><br>'
-        )
-
-        text = df.loc[i, "text"]
-        table = __sdr_table(df, i)
-        sources = __sources(df, sources_df, i)
-
-        panel = f"<br>{pct_used_text}{table}"
-        if text is not np.nan:
-            panel = f"<br>{text}" + panel
-        if sources is not np.nan:
-            panel = panel + f"<br>{sources}"
-
-        df.loc[i, "panel_html"] = panel
+    panel = "<br>" + _pct_used_html(df, "&emsp;&emsp;&emsp;") + __sdr_table(df)
+    panel = panel.mask(has_text, "<br>" + _as_str(df.text) + panel)
+    panel = panel.mask(sources.notna(), panel + "<br>" + sources)
 
+    df["panel_html"] = panel.astype(object)
     df = __null_message(df, "panel_html")
     df = __country_name(df, "panel_html")
 
     return df
 
 
+@profiling.timed("render:popup_html")
 def _add_popup_html(df: pd.DataFrame) -> pd.DataFrame:
     """Creates an HTML string for popups"""
 
-    df["popup_html"] = np.nan
-    for i in df.index:
-        holdings_pct_allocation = df.loc[i, "holdings_pct_allocation"]
-        holdings_pct_allocation_date = df.loc[i, "date"]
-        aug_allocation = df.loc[i, "sdrs_allocation_aug_23_usd"]
-        text = df.loc[i, "text"]
-        popup = (
-            '<br><p style="text-align:left;"><strong>SDR holdings</strong>: '
-            "&emsp;&emsp;&emsp;&emsp;"
-            f"<strong>{holdings_pct_allocation} % of cumulative allocations</strong></p>"
-            f'<p style="text-align:left;"><i>as of {holdings_pct_allocation_date}</i></p><br>'
-            '<br><p style="text-align:left;">SDR allocation: &emsp;&emsp;&emsp;'
-            f"{aug_allocation} USD millions</p>"
-            '<p style="text-align:left;"><i>on 23 August 2021</i></p><br>'
-        )
-        if text is not np.nan:
-            popup += f"<p>{text}</p><br>"
-        popup += f'<p style="text-align:center;"><strong>Click for more information</strong><p>'
-        df.loc[i, "popup_html"] = popup
+    has_text = df.text.notna()
+
+    popup = (
+        _pct_used_html(df, "&emsp;&emsp;&emsp;&emsp;")
+        + '<br><p style="text-align:left;">SDR allocation: &emsp;&emsp;&emsp;'
+        + _as_str(df.sdrs_allocation_aug_23_usd)
+        + " USD millions</p>"
+        '<p style="text-align:left;"><i>on 23 August 2021</i></p><br>'
+    )
+    popup = popup.mask(has_text, popup + "<p>" + _as_str(df.text) + "</p><br>")
+    popup += (
+        '<p style="text-align:center;"><strong>Click for more information</strong><p>'
+    )
+
+    df["popup_html"] = popup.astype(object)
     df = __null_message(df, "popup_html")
     df = __country_name(df, "popup_html")
 
     return df
 
 
-def create_sdr_map() -> None:
-    """creates a csv for flourish map"""
+def _fetch_inputs(year: int) -> dict:
+    """Downloads all remote inputs for the map, running independent sources in parallel"""
 
-    # get files
-    map_template = pd.read_csv(f"{config.Paths.glossaries}/map_template.csv")
-    df = utils.read_sheet(0)
+    sources = {
+        "tracker_sheet": fetch.Source(lambda: utils.read_sheet(0)),
+        "exchange_rate": fetch.Source(exchange_rates.latest_rate),
+        "references_sheet": fetch.Source(lambda: utils.read_sheet(1174650744)),
+        "gdp": fetch.Source(lambda: imf.get_gdp(year), timeout=600),
+        **download_sdr.fetch_sources(year),
+    }
+
+    return fetch.run(sources)
+
+
+def _hash_frame(df: pd.DataFrame) -> str:
+    """Returns a content hash for a dataframe"""
+
+    hashes = pd.util.hash_pandas_object(df, index=False).values
+
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def _input_fingerprint(inputs: dict, map_template: pd.DataFrame) -> dict:
+    """Summarises every input of the map, so that an unchanged run can be skipped"""
+
+    return {
+        "renderer": hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+        "map_template": _hash_frame(map_template),
+        "tracker_sheet": _hash_frame(inputs["tracker_sheet"]),
+        "references_sheet": _hash_frame(inputs["references_sheet"]),
+        "exchange_rate": _hash_frame(inputs["exchange_rate"]),
+        "imf_release": inputs["imf_release"]["date"],
+        "imf_sdr": _hash_frame(inputs["imf_sdr"]),
+        "gdp": _hash_frame(inputs["gdp"]),
+    }
+
+
+def _read_fingerprint() -> dict:
+    """Reads the fingerprint of the previous run, or an empty dictionary"""
+
+    try:
+        return json.loads(FINGERPRINT_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _add_html(
+    df: pd.DataFrame,
+    sources_df: pd.DataFrame,
+    previous: dict,
+    output: Path,
+    renderer: str,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Adds panel and popup HTML, rendering only countries whose data changed since the
+    previous run. HTML for other countries is copied from the existing sdr.csv in output.
+    The renderer fingerprint is part of each country's hash, so a change to the
+    templates re-renders every country.
+    Returns the dataframe and the hash of each country's data.
+    """
+
+    country_hashes = (
+        pd.util.hash_pandas_object(
+            df.assign(references=__sources(df, sources_df), renderer=renderer),
+            index=False,
+        )
+        .astype(str)
+        .set_axis(df.iso_code)
+        .to_dict()
+    )
+    output_path = output / "sdr.csv"
+    iso_codes = df.iso_code.astype(object)
+    changed = iso_codes.map(country_hashes) != iso_codes.map(previous)
+
+    if changed.all() or not output_path.exists() or df.iso_code.duplicated().any():
+        df = _add_panel_html(df, sources_df=sources_df)
+        return _add_popup_html(df), country_hashes
+
+    existing = (
+        pd.read_csv(output_path, usecols=["iso_code", "panel_html", "popup_html"])
+        .drop_duplicates("iso_code")
+        .set_index("iso_code")
+    )
+    rendered = _add_popup_html(
+        _add_panel_html(df.loc[changed].copy(), sources_df=sources_df)
+    )
+    for column in ["panel_html", "popup_html"]:
+        df[column] = df.iso_code.map(existing[column]).astype(object)
+        df.loc[changed, column] = rendered[column]
+
+    return df, country_hashes
+
+
+def _export_panels(
+    df: pd.DataFrame, output: Path, compression: tuple = COMPRESSION
+) -> dict:
+    """
+    Writes the panel of each country to panels/{iso_code}.{hash}.html
+    Fragments are immutable: only new or changed panels are written, and fragments
+    no longer in use are deleted. Returns the path of each country's panel.
+    """
+
+    panels_path = output / "panels"
+    panels_path.mkdir(exist_ok=True)
+    panels = {}
+    for iso_code, html in zip(df.iso_code, df.panel_html):
+        if pd.isna(html):
+            continue
+        name = f"{iso_code}.{hashlib.sha256(html.encode()).hexdigest()[:12]}.html"
+        panels[iso_code] = f"{panels_path.name}/{name}"
+        if not (panels_path / name).exists():
+            utils.write_output(panels_path / name, html, compression)
+
+    current = {Path(p).name for p in panels.values()}
+    for old_file in panels_path.glob("*.html*"):
+        if old_file.name.partition(".html")[0] + ".html" not in current:
+            old_file.unlink()
+
+    return panels
+
+
+def _export_split(
+    df: pd.DataFrame, output: Path, compression: tuple = COMPRESSION
+) -> None:
+    """
+    Writes the geometry to a content-hashed sdr_geometries.{hash}.csv and everything
+    else to sdr_data.csv, joined on iso_code. With PANEL_FRAGMENTS, panels are written
+    to their own files and left out of sdr_data.csv.
+    sdr_manifest.json lists the current files.
+    """
+
+    geometries = df.filter(["iso_code", "flourish_geom"], axis=1).to_csv(index=False)
+    geometry_hash = hashlib.sha256(geometries.encode()).hexdigest()[:12]
+    geometry_file = f"sdr_geometries.{geometry_hash}.csv"
+
+    # geometry files are immutable, so they are only written when the geometry changes
+    for old_file in output.glob("sdr_geometries.*.csv*"):
+        if not old_file.name.startswith(geometry_file):
+            old_file.unlink()
+    if not (output / geometry_file).exists():
+        utils.write_output(output / geometry_file, geometries, compression)
+
+    manifest = {"data": "sdr_data.csv", "geometry": geometry_file, "key": "iso_code"}
+    dropped = ["flourish_geom"]
+    if PANEL_FRAGMENTS:
+        manifest["panels"] = _export_panels(df, output, compression)
+        dropped.append("panel_html")
+
+    data = df.drop(columns=dropped).to_csv(index=False)
+    utils.write_output(output / "sdr_data.csv", data, compression)
+
+    utils.write_output(output / "sdr_manifest.json", json.dumps(manifest, indent=2))
+
+
+def _join_inputs(inputs: dict, map_template: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Joins the tracker sheet, the latest SDR release and GDP to the map template"""
+
+    df = inputs["tracker_sheet"]
 
     # merge sdr from google with map template and clean
     df = pd.merge(map_template, df, how="left", on="iso_code")
@@ -241,20 +453,149 @@ def create_sdr_map() -> None:
     df = df.dropna(subset=["country"])
 
     # add holdings and allocation
-    current_year = datetime.datetime.now().year
-    latest_sdr = download_sdr.get_latest_sdr(current_year)
+    latest_sdr = download_sdr.format_sdr(
+        inputs["imf_sdr"], exch_df=inputs["exchange_rate"]
+    )
     df = pd.merge(df, latest_sdr, on="iso_code", how="left")
 
     # add pct_gdp columns
     df = utils.add_pct_gdp(
         df,
         columns=["sdrs_allocation_aug_23_usd", "holdings_usd", "allocations_usd"],
-        gdp_year=current_year,
+        gdp_year=year,
+        gdp_df=inputs["gdp"],
     )
 
-    # add html for popups and panels
-    df = _add_panel_html(df)
-    df = _add_popup_html(df)
+    return df.astype({column: "category" for column in CATEGORY_COLUMNS})
+
+
+def _region_frames(df: pd.DataFrame, regions: dict) -> dict:
+    """
+    Returns the rows of the tracker frame in each region. Regions without any
+    tracker rows are skipped, and the files of a previous build are removed
+    """
+
+    frames = {}
+    for name, region in regions.items():
+        region_df = df.loc[df.iso_code.isin(_region_codes(region))]
+        if region_df.empty:
+            print(f"Skipping region {name}: no countries in the tracker sheet")
+            shutil.rmtree(config.Paths.output / "regions" / name, ignore_errors=True)
+            continue
+        frames[name] = region_df.reset_index(drop=True)
+
+    return frames
+
+
+def _build(
+    df: pd.DataFrame,
+    sources_df: pd.DataFrame,
+    previous: dict,
+    output: Path,
+    renderer: str,
+) -> dict:
+    """
+    Renders the html of a map and exports its files to output
+    Returns the hash of each country's data
+    """
+
+    # add html for popups and panels, re-rendering only countries that changed
+    df, country_hashes = _add_html(df, sources_df, previous, output, renderer)
 
     # export
-    df.to_csv(f"{config.Paths.output}/sdr.csv", index=False)
+    output.mkdir(parents=True, exist_ok=True)
+    with profiling.stage("export") as record:
+        df.to_csv(output / "sdr.csv", index=False)
+        if SPLIT_GEOMETRY:
+            _export_split(df, output)
+        export.write(df, output / "sdr", EXPORT_FORMATS)
+        record["rows"] = len(df)
+
+    return country_hashes
+
+
+def create_sdr_map(
+    regions: Optional[dict] = None, max_workers: Optional[int] = None
+) -> bool:
+    """
+    creates a csv for flourish map
+    Returns False when no input changed since the previous run and nothing was written
+
+    Parameters:
+        regions: dict       also build a map for each region, from the same inputs, into
+                            output/regions/{name}. See REGIONS and _region_codes
+        max_workers: int    number of processes building regions. Defaults to one per CPU
+    """
+
+    # get files
+    current_year = datetime.datetime.now().year
+    inputs = _fetch_inputs(current_year)
+    map_template = _africa_map_template()
+
+    # skip the update if no input changed
+    previous = _read_fingerprint()
+    fingerprint = _input_fingerprint(inputs, map_template)
+    if regions:
+        fingerprint["regions"] = regions
+    if (
+        previous.get("inputs") == fingerprint
+        and (config.Paths.output / "sdr.csv").exists()
+    ):
+        print("SDR inputs unchanged, skipping update")
+        return False
+
+    # join the inputs once, for every country any of the maps needs
+    template = _world_map_template() if regions else map_template
+    df = _join_inputs(inputs, template, current_year)
+    sources_df = inputs["references_sheet"]
+
+    region_hashes = {}
+    if regions:
+        previous_regions = previous.get("regions", {})
+        region_dfs = _region_frames(df, regions)
+        with profiling.stage("render:regions"), ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as pool:
+            futures = {
+                name: pool.submit(
+                    profiling.collect,
+                    _build,
+                    region_df,
+                    sources_df,
+                    previous_regions.get(name, {}),
+                    config.Paths.output / "regions" / name,
+                    fingerprint["renderer"],
+                )
+                for name, region_df in region_dfs.items()
+            }
+            country_hashes = _build(
+                df.loc[df.iso_code.isin(map_template.iso_code)].reset_index(drop=True),
+                sources_df,
+                previous.get("countries", {}),
+                config.Paths.output,
+                fingerprint["renderer"],
+            )
+            for name, future in futures.items():
+                region_hashes[name], stages = future.result()
+                profiling.add_stages(stages, prefix=f"{name}:")
+    else:
+        country_hashes = _build(
+            df,
+            sources_df,
+            previous.get("countries", {}),
+            config.Paths.output,
+            fingerprint["renderer"],
+        )
+
+    FINGERPRINT_PATH.write_text(
+        json.dumps(
+            {
+                "inputs": fingerprint,
+                "countries": country_hashes,
+                "regions": region_hashes,
+            },
+            indent=2,
+        )
+    )
+
+    return True
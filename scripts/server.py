@@ -0,0 +1,247 @@
+"""
+Read-only JSON service over the tracker outputs
+
+    python -m scripts.server [--host 127.0.0.1] [--port 8050]
+
+Loads output/sdr.csv and the RST timelines once, indexed by iso_code, region and date,
+and reloads them when create_sdr_map or update_rst_timeline_charts write new files.
+
+    /countries                  every country. Filters: ?iso_code=KEN,NGA&region=...&date=YYYY-MM-DD
+    /countries/{iso_code}       one country
+    /regions                    iso codes by region
+    /rst                        every RST event. Filters: ?iso_code=...&from=YYYY-MM-DD&to=YYYY-MM-DD
+    /rst/{iso_code}             the RST timeline of one country
+
+Responses carry an ETag, and requests with a matching If-None-Match get a 304.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from scripts import config
+
+HOST: str = "127.0.0.1"
+PORT: int = 8050
+# Seconds between checks for new output files
+RELOAD_SECONDS: float = 1.0
+# Geometry is only needed to draw the map, so it is left out of the responses
+EXCLUDED_COLUMNS: tuple = ("flourish_geom",)
+# Responses to filtered queries are cached until the next reload, up to this many
+MAX_CACHED: int = 4096
+
+
+def _watched_files(output: Path) -> list[Path]:
+    """Returns the output files the service is built from"""
+
+    return [output / "sdr.csv", *sorted((output / "rst_timeline").glob("*.csv"))]
+
+
+def _version(output: Path) -> str:
+    """Returns a key that changes whenever one of the watched files is replaced"""
+
+    stats = [
+        f"{f.name}:{f.stat().st_mtime_ns}:{f.stat().st_size}"
+        for f in _watched_files(output)
+        if f.exists()
+    ]
+
+    return hashlib.sha1("|".join(stats).encode()).hexdigest()[:12]
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """Converts a dataframe to a list of JSON-ready dictionaries, with NaN as None"""
+
+    return json.loads(df.to_json(orient="records"))
+
+
+def _iso_dates(dates: pd.Series) -> list:
+    """Converts dates like "30 June 2025" to "2025-06-30", or None"""
+
+    parsed = pd.to_datetime(dates, format="%d %B %Y", errors="coerce")
+
+    return [None if pd.isna(d) else f"{d:%Y-%m-%d}" for d in parsed]
+
+
+class Store:
+    """The tracker outputs, with indexes by iso_code, region and date"""
+
+    def __init__(self, output: Path):
+        self.version = _version(output)
+
+        sdr = pd.read_csv(output / "sdr.csv").drop(
+            columns=list(EXCLUDED_COLUMNS), errors="ignore"
+        )
+        self.countries = {r["iso_code"]: r for r in _records(sdr)}
+        self.by_region, self.by_date = {}, {}
+        for iso_code, region, date in zip(
+            sdr.iso_code, sdr.region, _iso_dates(sdr.date)
+        ):
+            if pd.notna(region):
+                self.by_region.setdefault(region, set()).add(iso_code)
+            self.by_date.setdefault(date, set()).add(iso_code)
+
+        self.timelines, events = {}, []
+        for file in sorted((output / "rst_timeline").glob("*.csv")):
+            df = pd.read_csv(file)
+            timeline = [
+                {"iso_code": file.stem, "iso_date": d, **r}
+                for d, r in zip(_iso_dates(df.date), _records(df))
+            ]
+            self.timelines[file.stem] = timeline
+            events.extend(e for e in timeline if e["iso_date"] is not None)
+
+        # events sorted by date, for range queries with bisect
+        self.events = sorted(events, key=lambda e: e["iso_date"])
+        self.event_dates = [e["iso_date"] for e in self.events]
+
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def _countries(self, params: dict) -> list[dict]:
+        """Returns the countries matching every filter"""
+
+        selected = set(self.countries)
+        if "iso_code" in params:
+            selected &= set(params["iso_code"].split(","))
+        if "region" in params:
+            selected &= self.by_region.get(params["region"], set())
+        if "date" in params:
+            selected &= self.by_date.get(params["date"], set())
+
+        return [self.countries[i] for i in sorted(selected)]
+
+    def _events(self, params: dict) -> list[dict]:
+        """Returns the RST events matching every filter, in date order"""
+
+        start = bisect.bisect_left(self.event_dates, params.get("from", ""))
+        end = (
+            bisect.bisect_right(self.event_dates, params["to"])
+            if "to" in params
+            else len(self.events)
+        )
+        events = self.events[start:end]
+        if "iso_code" in params:
+            codes = set(params["iso_code"].split(","))
+            events = [e for e in events if e["iso_code"] in codes]
+
+        return events
+
+    def query(self, path: str, params: dict):
+        """Returns the data for a request, or None when the resource does not exist"""
+
+        parts = [p for p in path.split("/") if p]
+        if parts == ["countries"]:
+            return self._countries(params)
+        if len(parts) == 2 and parts[0] == "countries":
+            return self.countries.get(parts[1])
+        if parts == ["regions"]:
+            return {r: sorted(codes) for r, codes in self.by_region.items()}
+        if parts == ["rst"]:
+            return self._events(params)
+        if len(parts) == 2 and parts[0] == "rst":
+            return self.timelines.get(parts[1])
+
+        return None
+
+    def response(self, path: str, params: dict) -> Optional[tuple[str, bytes]]:
+        """Returns the ETag and JSON body for a request, cached until the next reload"""
+
+        key = (path, tuple(sorted(params.items())))
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+
+        data = self.query(path, params)
+        if data is None:
+            return None
+        body = json.dumps(data, separators=(",", ":")).encode()
+        # the ETag only depends on the body, so it survives reloads that change nothing
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+        with self._lock:
+            if len(self._responses) >= MAX_CACHED:
+                self._responses.clear()
+            self._responses[key] = (etag, body)
+
+        return etag, body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, so Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        response = self.server.store.response(url.path, params)
+
+        if response is None:
+            self._send(404, b'{"error":"not found"}')
+            return
+        etag, body = response
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _watch(server: ThreadingHTTPServer, output: Path) -> None:
+    """Reloads the store whenever the output files change"""
+
+    while True:
+        time.sleep(RELOAD_SECONDS)
+        try:
+            if _version(output) != server.store.version:
+                server.store = Store(output)
+                print(f"Reloaded tracker outputs ({server.store.version})")
+        except Exception as error:
+            # keep serving the previous outputs until the new ones can be read
+            print(f"Could not reload tracker outputs: {error}")
+
+
+def make_server(
+    host: str = HOST, port: int = PORT, output: Path = config.Paths.output
+) -> ThreadingHTTPServer:
+    """Creates the server and starts watching the outputs. Call serve_forever to run it"""
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.store = Store(output)
+    threading.Thread(target=_watch, args=(server, output), daemon=True).start()
+
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"Serving tracker outputs on http://{args.host}:{args.port}")
+    server.serve_forever()
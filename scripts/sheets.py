@@ -0,0 +1,128 @@
+"""Google Sheets writer: one authorized client, and cell-level diffs sent in one batch"""
+
+import json
+import os
+from functools import lru_cache
+from numbers import Number
+from typing import TYPE_CHECKING
+
+# gspread and oauth2client are only imported when a sheet is opened
+if TYPE_CHECKING:
+    import gspread
+    import pandas as pd
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+
+@lru_cache
+def _credentials():
+    """Loads the service account credentials from the SHEETS_API environment variable"""
+
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    # Load key as json object
+    key = json.loads(os.environ["SHEETS_API"])
+
+    return ServiceAccountCredentials.from_json_keyfile_dict(
+        keyfile_dict=key, scopes=SCOPES
+    )
+
+
+@lru_cache
+def client() -> "gspread.client.Client":
+    """Returns an authorized Google Sheets client, shared by every write of the run"""
+
+    import gspread
+
+    return gspread.authorize(_credentials())
+
+
+@lru_cache
+def _workbook(workbook_key: str) -> "gspread.Spreadsheet":
+    """Opens a workbook once per run"""
+
+    return client().open_by_key(key=workbook_key)
+
+
+def worksheet(workbook_key: str, worksheet_id: int) -> "gspread.Worksheet":
+    """Returns a worksheet, reusing the client and the workbook"""
+
+    return _workbook(workbook_key).get_worksheet_by_id(id=worksheet_id)
+
+
+def _a1(row: int, col: int) -> str:
+    """Converts a 1-based row and column to A1 notation"""
+
+    letters = ""
+    while col:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+
+    return f"{letters}{row}"
+
+
+def _values(df: "pd.DataFrame") -> list[list]:
+    """Returns the header and rows of a dataframe as a grid of python values"""
+
+    columns = [str(col).replace("\n", "").strip() for col in df.columns]
+
+    return [columns] + df.fillna("").values.tolist()
+
+
+def _same(old, new) -> bool:
+    """Compares a cell read from the sheet with the value to write"""
+
+    if isinstance(old, Number) and isinstance(new, Number):
+        return float(old) == float(new)
+
+    return str(old) == str(new)
+
+
+def diff(current: list[list], values: list[list]) -> list[dict]:
+    """
+    Returns the batch_update ranges that turn the current grid into values.
+    Consecutive changed cells of a row are sent as one range. Cells of the current
+    grid outside values are cleared.
+    """
+
+    n_rows = max(len(current), len(values))
+    n_cols = max([len(r) for r in current + values] or [0])
+    updates = []
+
+    for i in range(n_rows):
+        old_row = current[i] if i < len(current) else []
+        new_row = values[i] if i < len(values) else []
+        run_start, run = None, []
+        for j in range(n_cols + 1):
+            changed = False
+            if j < n_cols:
+                old = old_row[j] if j < len(old_row) else ""
+                new = new_row[j] if j < len(new_row) else ""
+                changed = not _same(old, new)
+            if changed:
+                run_start = j if run_start is None else run_start
+                run.append(new)
+            elif run:
+                updates.append({"range": _a1(i + 1, run_start + 1), "values": [run]})
+                run_start, run = None, []
+
+    return updates
+
+
+def sync(df: "pd.DataFrame", worksheet_obj: "gspread.Worksheet") -> int:
+    """
+    Writes a dataframe to a worksheet, starting at A1.
+    The current values are read once and only the cells that changed are sent, in a
+    single batch_update. Nothing is sent when the sheet is already up to date.
+    Any object with gspread's get_values and batch_update methods can be used as the
+    worksheet, e.g. a fake worksheet in tests.
+    Returns the number of ranges updated.
+    """
+
+    current = worksheet_obj.get_values(value_render_option="UNFORMATTED_VALUE")
+    updates = diff(current, _values(df))
+
+    if updates:
+        worksheet_obj.batch_update(updates)
+
+    return len(updates)
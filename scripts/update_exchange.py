@@ -1,59 +1,31 @@
-import json
-import os
+from typing import TYPE_CHECKING
 
-import gspread
-import pandas as pd
-from bblocks import set_bblocks_data_path
-from bblocks.import_tools.sdr import get_latest_exchange_rate
-from oauth2client.service_account import ServiceAccountCredentials
+from scripts import config, sheets
 
-from scripts import config
-
-set_bblocks_data_path(config.Paths.raw_data)
-# Load key as json object
-KEY: json = json.loads(os.environ["SHEETS_API"])
+# pandas, bblocks and exchange_rates are imported where they are used, so importing this module is
+# cheap and does not need the SHEETS_API credentials
+if TYPE_CHECKING:
+    import gspread
+    import pandas as pd
 
 WORKBOOK_KEY: str = "1fIZkFJ686FrPmogt0iDlTv3aV75VyO1-MfEow2cgaFg"
 WORKSHEET_KEY: int = 0
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-CREDENTIALS = ServiceAccountCredentials.from_json_keyfile_dict(
-    keyfile_dict=KEY, scopes=SCOPES
-)
-
-
-def _authenticate() -> gspread.client.Client:
-    """Authenticate with Google Sheets API"""
-
-    return gspread.authorize(CREDENTIALS)
-
-
-def _get_workbook(
-    authenticated_client: gspread.client.Client, workbook_key: str
-) -> gspread.Spreadsheet:
-    """Get workbook from Google Sheets API"""
-
-    return authenticated_client.open_by_key(key=workbook_key)
 
 
-def _get_worksheet(
-    workbook: gspread.Spreadsheet, worksheet_key: int
-) -> gspread.Worksheet:
-    """Get worksheet from Google Sheets API"""
+def df2gsheet(df: "pd.DataFrame", worksheet_obj: "gspread.Worksheet") -> None:
+    """Write dataframe to Google Sheets API, sending only the cells that changed"""
 
-    return workbook.get_worksheet_by_id(id=worksheet_key)
+    if sheets.sync(df, worksheet_obj) == 0:
+        print("Exchange rate sheet is already up to date")
 
 
-def df2gsheet(df: pd.DataFrame, worksheet_obj: gspread.Worksheet) -> None:
-    """Write dataframe to Google Sheets API"""
-
-    columns = [str(col).replace("\n", "").strip() for col in df.columns]
-    values = df.fillna("").values.tolist()
-
-    worksheet_obj.update([columns] + values)
-
-
-def get_latest_exchange_sdr() -> pd.DataFrame:
+def get_latest_exchange_sdr() -> "pd.DataFrame":
     """Returns the latest exchange rate of the SDR"""
+    import pandas as pd
+    from bblocks import set_bblocks_data_path
+    from bblocks.import_tools.sdr import get_latest_exchange_rate
+
+    set_bblocks_data_path(config.Paths.raw_data)
     usd_exchange = get_latest_exchange_rate("USD")
 
     return (
@@ -70,10 +42,12 @@ def get_latest_exchange_sdr() -> pd.DataFrame:
 
 
 def upload_exchange() -> None:
+    from scripts import exchange_rates
+
     data = get_latest_exchange_sdr()
-    auth = _authenticate()
-    wb = _get_workbook(auth, WORKBOOK_KEY)
-    sheet = _get_worksheet(wb, WORKSHEET_KEY)
+    # the tracker update reads this file first and only falls back to the sheet
+    exchange_rates.write_latest(data)
+    sheet = sheets.worksheet(WORKBOOK_KEY, WORKSHEET_KEY)
 
     # Upload data
     df2gsheet(data, sheet)
@@ -1,8 +1,15 @@
-from scripts import imf
+from scripts import http_cache, imf, profiling
 
+import functools
+import gzip
+import io
+import os
 import pandas as pd
+import requests
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Optional
-import country_converter as coco
 import time
 
 
@@ -15,22 +22,28 @@ def read_sheet(grid_number: int) -> pd.DataFrame:
         f"gid={grid_number}&single=true&output=csv"
     )
     try:
-        return pd.read_csv(url)
-    except ConnectionError:
-        raise ConnectionError("Could not read sheet")
+        content = http_cache.fetch(url, ttl=http_cache.TTL["sheet"])
+    except requests.RequestException as error:
+        raise ConnectionError(f"Could not read sheet {grid_number}") from error
 
+    return pd.read_csv(io.BytesIO(content))
 
+
+@profiling.timed("add_pct_gdp")
 def add_pct_gdp(
     df: pd.DataFrame,
     columns: list,
     *,
     gdp_year: Optional[int] = 2021,
+    gdp_df: Optional[pd.DataFrame] = None,
 ):
     """
     adds column(s) to a dataframe with a value as a pct of GDP
+    gdp_df can be passed when GDP data for gdp_year has already been loaded
     """
     # download GDP data using WEO package
-    gdp_df = imf.get_gdp(gdp_year)
+    if gdp_df is None:
+        gdp_df = imf.get_gdp(gdp_year)
 
     # merge GDP data with provided df
     df = pd.merge(df, gdp_df, on="iso_code", how="left").assign(
@@ -67,6 +80,8 @@ def country_df(columns: Optional[list] = None) -> pd.DataFrame:
             'obsolete', 'Cecilia2050', 'BRIC','APEC', 'BASIC', 'CIS',
             'G7', 'G20', 'IEA', 'regex'
     """
+    import country_converter as coco
+
     if columns is None:
         columns = ["ISO3", "continent"]
 
@@ -75,15 +90,62 @@ def country_df(columns: Optional[list] = None) -> pd.DataFrame:
     )
 
 
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Yields a temporary path next to path, which is renamed into place if the block
+    succeeds and deleted otherwise, so a failed or concurrent write never leaves a
+    partial file at path
+    """
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(tmp)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes bytes to a file atomically, see atomic_path"""
+
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(data)
+
+
+def write_output(path: Path, content: str, compression: tuple = ()) -> None:
+    """
+    Writes a text file atomically, plus pre-compressed copies next to it
+        compression: any of "gzip" (.gz) and "brotli" (.br). brotli needs the brotli package
+    """
+
+    data = content.encode("utf-8")
+    files = {path: data}
+    if "gzip" in compression:
+        # mtime=0 keeps the output identical when the content has not changed
+        files[path.with_name(f"{path.name}.gz")] = gzip.compress(data, mtime=0)
+    if "brotli" in compression:
+        import brotli
+
+        files[path.with_name(f"{path.name}.br")] = brotli.compress(data)
+
+    for file, file_data in files.items():
+        write_atomic(file, file_data)
+
+
 def time_script(func):
     """Decorator to time script"""
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start = time.perf_counter()
-        func()
+        result = func(*args, **kwargs)
         end = time.perf_counter()
         elapsed = round((end - start) / 60, 2)
         print(f"Time elapsed: {elapsed} min")
+        return result
 
     return wrapper
 
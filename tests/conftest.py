@@ -0,0 +1,65 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves server.resources, honouring If-None-Match and If-Modified-Since"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        resource = self.server.resources.get(self.path)
+        if resource is None:
+            self._send(404)
+            return
+
+        etag = resource.get("etag")
+        last_modified = resource.get("last_modified")
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            last_modified and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self._send(304, etag=etag, last_modified=last_modified)
+            return
+        time.sleep(resource.get("delay", 0))
+        self._send(resource.get("status", 200), resource["body"], etag, last_modified)
+
+    def _send(self, status, body=b"", etag=None, last_modified=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """
+    A local stand-in for the remote sources
+    Set server.resources[path] = {"body": ..., "etag": ..., "last_modified": ...}, and
+    optionally "status" and "delay", in seconds before the response is sent.
+    Every request is recorded in server.requests as (path, headers).
+    """
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.resources, server.requests = {}, []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    ).start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
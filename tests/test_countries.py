@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from scripts import countries
+
+
+@pytest.fixture
+def names(tmp_path, monkeypatch):
+    monkeypatch.setattr(countries, "CACHE_PATH", tmp_path / "country_names.json")
+    monkeypatch.setattr(countries, "_coco_version", lambda: "test")
+    monkeypatch.setattr(countries, "_names", {"Kenya": "KEN", "Atlantis": None})
+    countries._save_names()
+
+
+def test_to_iso3_does_not_report_aggregates(names, capsys):
+    codes = countries.to_iso3(["Kenya", "Total", "Atlantis"])
+
+    assert codes.tolist() == ["KEN", countries.NOT_FOUND, countries.NOT_FOUND]
+    assert capsys.readouterr().out == (
+        "Could not resolve country names: ['Atlantis']\n"
+    )
+
+
+def test_name_cache_is_written_atomically(names, tmp_path):
+    cache = json.loads(countries.CACHE_PATH.read_text())
+
+    assert cache == {
+        "coco_version": "test",
+        "names": {"Kenya": "KEN", "Atlantis": None},
+    }
+    assert [p.name for p in tmp_path.iterdir()] == ["country_names.json"]
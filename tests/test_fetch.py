@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+import requests
+
+from scripts import fetch, http_cache
+
+
+def test_run_passes_results_to_dependent_sources():
+    sources = {
+        "b": fetch.Source(lambda a: a + 1, requires=("a",)),
+        "a": fetch.Source(lambda: 1),
+    }
+
+    assert fetch.run(sources) == {"a": 1, "b": 2}
+
+
+def test_timeout_stops_the_request(http_server, tmp_path):
+    http_server.resources["/slow"] = {"body": b"late", "delay": 10}
+    url = f"{http_server.url}/slow"
+    source = fetch.Source(
+        lambda: http_cache.fetch(url, cache_dir=tmp_path), timeout=0.5
+    )
+    threads = set(threading.enumerate())
+
+    with pytest.raises((TimeoutError, requests.Timeout)):
+        fetch.run({"slow": source})
+
+    # the worker gives up on the request too, instead of waiting for the response
+    for thread in set(threading.enumerate()) - threads:
+        if thread.name.startswith("ThreadPoolExecutor"):
+            thread.join(timeout=2)
+            assert not thread.is_alive()
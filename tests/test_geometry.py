@@ -0,0 +1,51 @@
+import json
+
+import pandas as pd
+import pytest
+
+from scripts import geometry, utils
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    path = tmp_path / "geometries.json"
+    monkeypatch.setattr(geometry, "SOURCE_PATH", path)
+    monkeypatch.setattr(geometry, "STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(
+        utils,
+        "country_df",
+        lambda: pd.DataFrame({"iso_code": ["KEN", "NGA"], "continent": ["Africa"] * 2}),
+    )
+
+    def write(codes):
+        rows = [["geometry", "3-letter ISO code"]] + [[f"geom-{c}", c] for c in codes]
+        path.write_text(json.dumps(rows))
+
+    return write
+
+
+def test_build_store_replaces_old_stores(source):
+    source(["KEN"])
+    old = geometry._store_path(None)
+    geometry._build_store(old, None)
+    source(["KEN", "NGA"])
+    new = geometry._store_path(None)
+    geometry._build_store(new, None)
+
+    assert list(geometry.STORE_DIR.iterdir()) == [new]
+    assert pd.read_parquet(new).iso_code.tolist() == ["KEN", "NGA"]
+
+
+def test_failed_build_leaves_no_store(source, monkeypatch):
+    source(["KEN"])
+    path = geometry._store_path(None)
+
+    def fail(self, *args, **kwargs):
+        args[0].write_bytes(b"partial")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", fail)
+    with pytest.raises(KeyboardInterrupt):
+        geometry._build_store(path, None)
+
+    assert list(geometry.STORE_DIR.iterdir()) == []
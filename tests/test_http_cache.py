@@ -0,0 +1,132 @@
+import time
+
+from scripts import http_cache
+
+
+def test_fetch_downloads_and_caches(http_server, tmp_path):
+    http_server.resources["/a"] = {"body": b"first", "etag": '"1"'}
+    url = f"{http_server.url}/a"
+
+    assert http_cache.fetch(url, ttl=60, cache_dir=tmp_path) == b"first"
+    assert http_cache.fetch(url, ttl=60, cache_dir=tmp_path) == b"first"
+    assert len(http_server.requests) == 1
+
+
+def test_fetch_revalidates_with_etag(http_server, tmp_path):
+    http_server.resources["/a"] = {"body": b"first", "etag": '"1"'}
+    url = f"{http_server.url}/a"
+
+    http_cache.fetch(url, cache_dir=tmp_path)
+    # the server would now send a different body, but the ETag still matches
+    http_server.resources["/a"]["body"] = b"second"
+
+    assert http_cache.fetch(url, cache_dir=tmp_path) == b"first"
+    assert http_server.requests[-1][1]["If-None-Match"] == '"1"'
+
+
+def test_fetch_revalidates_with_last_modified(http_server, tmp_path):
+    last_modified = "Wed, 01 Jul 2026 00:00:00 GMT"
+    http_server.resources["/a"] = {"body": b"first", "last_modified": last_modified}
+    url = f"{http_server.url}/a"
+
+    http_cache.fetch(url, cache_dir=tmp_path)
+    http_server.resources["/a"]["body"] = b"second"
+
+    assert http_cache.fetch(url, cache_dir=tmp_path) == b"first"
+    assert http_server.requests[-1][1]["If-Modified-Since"] == last_modified
+    assert "If-None-Match" not in http_server.requests[-1][1]
+
+
+def test_fetch_downloads_changed_resource(http_server, tmp_path):
+    http_server.resources["/a"] = {"body": b"first", "etag": '"1"'}
+    url = f"{http_server.url}/a"
+
+    http_cache.fetch(url, cache_dir=tmp_path)
+    http_server.resources["/a"] = {"body": b"second", "etag": '"2"'}
+
+    assert http_cache.fetch(url, cache_dir=tmp_path) == b"second"
+    assert http_cache.fetch(url, ttl=60, cache_dir=tmp_path) == b"second"
+
+
+def test_fetch_revalidates_after_ttl(http_server, tmp_path, monkeypatch):
+    http_server.resources["/a"] = {"body": b"first", "etag": '"1"'}
+    url = f"{http_server.url}/a"
+    now = time.time()
+
+    http_cache.fetch(url, ttl=60, cache_dir=tmp_path)
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 30)
+    http_cache.fetch(url, ttl=60, cache_dir=tmp_path)
+    assert len(http_server.requests) == 1
+
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 90)
+    http_cache.fetch(url, ttl=60, cache_dir=tmp_path)
+    assert len(http_server.requests) == 2
+    assert http_server.requests[-1][1]["If-None-Match"] == '"1"'
+
+
+def test_fetch_evicts_least_recently_used(http_server, tmp_path, monkeypatch):
+    for name in "abc":
+        http_server.resources[f"/{name}"] = {"body": name.encode() * 100}
+    urls = {name: f"{http_server.url}/{name}" for name in "abc"}
+    now = time.time()
+
+    monkeypatch.setattr(http_cache.time, "time", lambda: now)
+    http_cache.fetch(urls["a"], ttl=60, cache_dir=tmp_path, max_bytes=250)
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 1)
+    http_cache.fetch(urls["b"], ttl=60, cache_dir=tmp_path, max_bytes=250)
+    # using a again makes b the least recently used entry
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 2)
+    http_cache.fetch(urls["a"], ttl=60, cache_dir=tmp_path, max_bytes=250)
+    monkeypatch.setattr(http_cache.time, "time", lambda: now + 3)
+    http_cache.fetch(urls["c"], ttl=60, cache_dir=tmp_path, max_bytes=250)
+
+    cached = {
+        name: http_cache._cache_paths(url, tmp_path)[0].exists()
+        for name, url in urls.items()
+    }
+    assert cached == {"a": True, "b": False, "c": True}
+
+
+def test_fetch_treats_evicted_body_as_miss(http_server, tmp_path):
+    http_server.resources["/a"] = {"body": b"first", "etag": '"1"'}
+    url = f"{http_server.url}/a"
+
+    http_cache.fetch(url, ttl=60, cache_dir=tmp_path)
+    # another thread evicted the body, but not yet the metadata
+    http_cache._cache_paths(url, tmp_path)[0].unlink()
+
+    assert http_cache.fetch(url, ttl=60, cache_dir=tmp_path) == b"first"
+    assert "If-None-Match" not in http_server.requests[-1][1]
+
+
+def test_fetch_only_scans_the_cache_when_full(http_server, tmp_path, monkeypatch):
+    evictions = []
+    evict = http_cache._evict
+    monkeypatch.setattr(
+        http_cache, "_evict", lambda *args: evictions.append(args) or evict(*args)
+    )
+    for i in range(5):
+        http_server.resources[f"/{i}"] = {"body": b"x" * 100}
+        http_cache.fetch(f"{http_server.url}/{i}", cache_dir=tmp_path, max_bytes=450)
+
+    # the fifth body takes the cache over 450 bytes, which evicts down to 360
+    assert len(evictions) == 1
+    assert len(list(tmp_path.glob("*.body"))) == 3
+
+
+def test_batch_evicts_once_at_the_end(http_server, tmp_path, monkeypatch):
+    evictions = []
+    evict = http_cache._evict
+    monkeypatch.setattr(
+        http_cache, "_evict", lambda *args: evictions.append(args) or evict(*args)
+    )
+    with http_cache.batch(cache_dir=tmp_path, max_bytes=250):
+        for i in range(5):
+            http_server.resources[f"/{i}"] = {"body": b"x" * 100}
+            http_cache.fetch(
+                f"{http_server.url}/{i}", cache_dir=tmp_path, max_bytes=250
+            )
+        assert evictions == []
+
+    assert len(evictions) == 1
+    assert len(list(tmp_path.glob("*.body"))) == 2
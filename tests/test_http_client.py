@@ -0,0 +1,31 @@
+import pytest
+import requests
+
+from scripts import http_client
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF", 0.01)
+
+
+def test_get_retries_server_errors(http_server):
+    http_server.resources["/a"] = {"body": b"", "status": 503}
+
+    with pytest.raises(requests.HTTPError):
+        http_client.get(f"{http_server.url}/a", retries=2)
+    assert len(http_server.requests) == 3
+
+
+def test_get_does_not_retry_client_errors(http_server):
+    with pytest.raises(requests.HTTPError):
+        http_client.get(f"{http_server.url}/missing")
+    assert len(http_server.requests) == 1
+
+
+def test_get_passes_not_modified_through(http_server):
+    http_server.resources["/a"] = {"body": b"body", "etag": '"1"'}
+
+    response = http_client.get(f"{http_server.url}/a", headers={"If-None-Match": '"1"'})
+    assert response.status_code == 304
+    assert response.content == b""
@@ -0,0 +1,67 @@
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+from scripts import imf
+
+
+class _FakeWEO:
+    """Stands in for bblocks' WorldEconomicOutlook, counting the WEO loads"""
+
+    loads = 0
+    year, release = 2026, "October"
+
+    def load_data(self, indicator):
+        _FakeWEO.loads += 1
+
+    def get_data(self):
+        return pd.DataFrame(
+            {
+                "iso_code": ["KEN", "NGA"],
+                "year": pd.to_datetime(["2026-01-01", "2026-01-01"]),
+                "value": [100.0, 400.0],
+            }
+        )
+
+
+@pytest.fixture
+def weo(tmp_path, monkeypatch):
+    bblocks = types.ModuleType("bblocks")
+    bblocks.WorldEconomicOutlook = _FakeWEO
+    bblocks.set_bblocks_data_path = lambda path: None
+    monkeypatch.setitem(sys.modules, "bblocks", bblocks)
+    monkeypatch.setattr(imf, "GDP_PATH", tmp_path)
+    monkeypatch.setattr(_FakeWEO, "loads", 0)
+    imf._gdp_table.cache_clear()
+
+    yield _FakeWEO
+
+    imf._gdp_table.cache_clear()
+
+
+def test_vintage_normalizes_release_names():
+    assert imf._vintage(2026, "October") == imf._vintage(2026, 2) == "2026_2"
+    assert imf._vintage(2026, "April") == "2026_1"
+    assert imf._weo_vintage(pd.Timestamp("2026-10-18").date()) == "2026_2"
+
+
+def test_gdp_table_is_loaded_once_per_vintage(weo):
+    first = imf._gdp_table("2026_2")
+    imf._gdp_table.cache_clear()
+    second = imf._gdp_table("2026_2")
+
+    assert weo.loads == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_unpublished_vintage_is_not_reloaded_every_run(weo, monkeypatch):
+    monkeypatch.setattr(weo, "release", "April")
+
+    imf._gdp_table("2026_2")
+    imf._gdp_table.cache_clear()
+    imf._gdp_table("2026_2")
+
+    assert weo.loads == 1
+    assert (imf.GDP_PATH / "ngdpd_2026_1.parquet").exists()
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+from benchmarks import fixtures
+
+SCALE: int = 10
+# Traced peak memory allowed for each benchmark target at SCALE, in MB: about 1.5
+# times the peak measured when the ceilings were set
+PEAK_MB: dict = {
+    "download_sdr._get_df": 0.25,
+    "utils.add_pct_gdp": 0.5,
+    "sdr_tracker._add_panel_html": 4.5,
+    "sdr_tracker._add_popup_html": 1.5,
+    "rst.update_rst_timeline_charts": 2.0,
+    "sdr_tracker.create_sdr_map": 15.0,
+}
+
+
+def test_peak_memory_stays_under_ceilings():
+    # the benchmarks patch paths and remote inputs, so they run in their own process
+    code = (
+        "import json; from benchmarks import run; "
+        f"print(json.dumps(run.run(({SCALE},), repeat=1, targets={tuple(PEAK_MB)})))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=fixtures.PROJECT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    results = json.loads(output.splitlines()[-1])
+
+    peaks = {name: results[f"{name} peak_mb"][str(SCALE)] for name in PEAK_MB}
+    assert {n: p for n, p in peaks.items() if p > PEAK_MB[n]} == {}
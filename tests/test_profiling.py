@@ -0,0 +1,32 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts import profiling
+
+
+def _work(n: int) -> int:
+    with profiling.stage("work"):
+        return sum(range(n))
+
+
+def test_stage_records_its_own_memory():
+    profiling.start()
+    with profiling.stage("small") as record:
+        pass
+
+    assert record["rss_growth_mb"] == 0
+    assert "peak_memory_mb" not in record
+
+
+def test_stages_of_worker_processes_are_reported(tmp_path):
+    profiling.start()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futures = {name: pool.submit(profiling.collect, _work, 10) for name in "ab"}
+        for name, future in futures.items():
+            result, stages = future.result()
+            profiling.add_stages(stages, prefix=f"{name}:")
+    assert result == 45
+
+    report = profiling.finish(tmp_path / "report.jsonl")
+    assert sorted(s["stage"] for s in report["stages"]) == ["a:work", "b:work"]
+    assert json.loads((tmp_path / "report.jsonl").read_text()) == report
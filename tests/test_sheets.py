@@ -0,0 +1,57 @@
+import pandas as pd
+
+from scripts import sheets
+
+
+class _FakeWorksheet:
+    """Stands in for a gspread worksheet, applying and recording batch_update calls"""
+
+    def __init__(self, values: list[list]):
+        self.values = [list(row) for row in values]
+        self.batches = []
+
+    def get_values(self, value_render_option=None):
+        return [list(row) for row in self.values]
+
+    def batch_update(self, updates):
+        self.batches.append(updates)
+        for update in updates:
+            column, row = update["range"][0], int(update["range"][1:])
+            for offset, value in enumerate(update["values"][0]):
+                cells = self.values[row - 1]
+                index = ord(column) - ord("A") + offset
+                cells.extend([""] * (index + 1 - len(cells)))
+                cells[index] = value
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"iso_code": ["KEN", "NGA"], "holdings": [1.5, 2.0], "date": ["a", "b"]}
+    )
+
+
+def test_sync_sends_only_changed_cells_in_one_batch():
+    worksheet = _FakeWorksheet(sheets._values(_frame()))
+    df = _frame()
+    df.loc[1, ["holdings", "date"]] = [3.0, "c"]
+
+    assert sheets.sync(df, worksheet) == 1
+    assert worksheet.batches == [[{"range": "B3", "values": [[3.0, "c"]]}]]
+    assert worksheet.values == sheets._values(df)
+
+
+def test_sync_sends_nothing_when_unchanged():
+    # numbers read back from the sheet may be ints where the frame has floats
+    worksheet = _FakeWorksheet([["iso_code", "holdings", "date"], ["KEN", 1.5, "a"]])
+    worksheet.values.append(["NGA", 2, "b"])
+
+    assert sheets.sync(_frame(), worksheet) == 0
+    assert worksheet.batches == []
+
+
+def test_sync_clears_rows_no_longer_in_the_frame():
+    worksheet = _FakeWorksheet(sheets._values(_frame()) + [["UGA", 4.0, "d"]])
+
+    sheets.sync(_frame(), worksheet)
+
+    assert worksheet.batches == [[{"range": "A4", "values": [["", "", ""]]}]]
@@ -0,0 +1,28 @@
+import pytest
+
+from scripts import utils
+
+
+def test_atomic_path_replaces_the_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("old")
+
+    with utils.atomic_path(path) as tmp:
+        tmp.write_text("new")
+        assert path.read_text() == "old"
+
+    assert path.read_text() == "new"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_atomic_path_keeps_the_file_when_writing_fails(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("old")
+
+    with pytest.raises(ValueError):
+        with utils.atomic_path(path) as tmp:
+            tmp.write_text("partial")
+            raise ValueError
+
+    assert path.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [path]
@@ -1,4 +1,6 @@
-from scripts import sdr_tracker, config
+import os
+
+from scripts import sdr_tracker, config, profiling
 from csv import writer
 from datetime import datetime
 
@@ -14,13 +16,18 @@ def last_updated():
 
 
 if __name__ == "__main__":
-    # create map template for Africa
-    sdr_tracker.create_africa_map_template()
-
-    # create flourish csv
-    sdr_tracker.create_sdr_map()
-
-    # append run time
-    last_updated()
+    # set SDR_PROFILE to "cprofile" or "tracemalloc" to also dump a profile of the run
+    profiling.start(os.environ.get("SDR_PROFILE"))
+
+    try:
+        # create map template for Africa
+        sdr_tracker.create_africa_map_template()
+
+        # create flourish csv and the regional maps, skipping the run time if nothing changed
+        if sdr_tracker.create_sdr_map(regions=sdr_tracker.REGIONS):
+            last_updated()
+    finally:
+        # append stage timings to output/run_report.jsonl, also when the run fails
+        profiling.finish()
 
     print("Successfully updated SDRs Tracker")